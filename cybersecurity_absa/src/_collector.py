@@ -0,0 +1,183 @@
+# src/_collector.py
+from trafilatura import fetch_url, bare_extraction
+import pandas as pd
+import json
+import time
+import shelve
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+from datetime import datetime
+from email.utils import formatdate
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from _config import PROJECT_ROOT, load_config
+from _results import ResultColumns
+
+# Concurrent downloads overall, and per host (each followed by REQUEST_DELAY seconds)
+MAX_WORKERS = 8
+MAX_REQUESTS_PER_HOST = 4
+REQUEST_DELAY = 2
+# Seconds a downloaded page is reused from the on-disk cache
+CACHE_MAX_AGE = 24 * 60 * 60
+
+# Output columns, in the order they appear in the CSV
+REPORT_FIELDS = (
+    'source', 'url', 'title', 'content_text', 'author', 'date', 'description',
+    'sitename', 'categories', 'tags', 'date_collected', 'extraction_success',
+    'metadata_full', 'error'
+)
+
+def _normalize_url(url):
+    """Canonical form of a URL: lowercase scheme and host, no trailing slash or fragment"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+
+def _unchanged_since(url, timestamp):
+    """True if the server answers a HEAD request with If-Modified-Since timestamp with 304"""
+    request = Request(url, method='HEAD', headers={'If-Modified-Since': formatdate(timestamp, usegmt=True)})
+    try:
+        with urlopen(request, timeout=10):
+            return False
+    except HTTPError as e:
+        return e.code == 304
+    except OSError:
+        return False
+
+class TrafilaturaReportsCollector:
+    """
+    Download and extract reports with Trafilatura's bare_extraction.
+
+    Subclasses set SOURCE_NAME, CACHE_NAME (the page cache file under the raw
+    data directory), BASE_URL, REPORT_URLS and MAX_REPORTS.
+    """
+    SOURCE_NAME = None
+    CACHE_NAME = None
+    BASE_URL = None
+    REPORT_URLS = ()
+    MAX_REPORTS = None
+
+    def __init__(self):
+        # Read configuration from project root (parsed once per process)
+        self.config = load_config()
+        self.project_root = PROJECT_ROOT
+
+        # Pages downloaded in earlier runs are reused for CACHE_MAX_AGE seconds
+        # (one cache per collector, as the collectors may run concurrently)
+        raw_data_dir = self.project_root / self.config.get('paths', 'raw_data_dir', fallback='data/raw')
+        self.cache_path = raw_data_dir / self.CACHE_NAME
+
+        self.base_url = self.BASE_URL
+        # Drop URLs that differ only in spelling so no page is fetched twice;
+        # the normalized URL is also the cache key
+        self.report_urls = list(dict.fromkeys(_normalize_url(url) for url in self.REPORT_URLS))
+
+    def _fetch(self, url):
+        """
+        Return the page at url, from the cache when a fresh copy exists or the
+        server confirms the cached copy is unchanged. Requests hold one of the
+        host's slots for REQUEST_DELAY seconds.
+        """
+        with self._cache_lock:
+            entry = self._cache.get(url)
+        if entry and time.time() - entry['ts'] < CACHE_MAX_AGE:
+            return entry['html']
+
+        with self._host_slots[urlsplit(url).netloc]:
+            # An expired page is revalidated with a HEAD request and only
+            # downloaded again when the server reports it has changed
+            if entry and _unchanged_since(url, entry['ts']):
+                downloaded = entry['html']
+            else:
+                downloaded = fetch_url(url)
+            time.sleep(REQUEST_DELAY)  # Respect server rate limits
+
+        if downloaded:
+            with self._cache_lock:
+                self._cache[url] = {'ts': time.time(), 'html': downloaded}
+        return downloaded
+
+    def _failure_row(self, url, title, error):
+        """Record for a URL whose report could not be extracted"""
+        return {
+            'source': self.SOURCE_NAME,
+            'url': url,
+            'title': title,
+            'content_text': '',
+            'date_collected': self._collected_at,
+            'extraction_success': False,
+            'error': error
+        }
+
+    def _collect_report(self, position, url):
+        """Download and extract a single report, returning its record"""
+        print(f"Extracting report {position}: {url}")
+        try:
+            downloaded = self._fetch(url)
+            if downloaded:
+                # Use bare_extraction which returns a dict with metadata
+                content_doc = bare_extraction(downloaded, url=url, with_metadata=True)
+                content = content_doc.as_dict() if content_doc else None
+
+                if content and content.get('text'):
+                    report_data = {
+                        'source': self.SOURCE_NAME,
+                        'url': url,
+                        'title': content.get('title', 'No Title'),
+                        'content_text': content.get('text', ''),
+                        'author': content.get('author', ''),
+                        'date': content.get('date', ''),
+                        'description': content.get('description', ''),
+                        'sitename': content.get('sitename', ''),
+                        'categories': content.get('categories', ''),
+                        'tags': content.get('tags', ''),
+                        'date_collected': self._collected_at,
+                        'extraction_success': True,
+                        # Store the rest of the extraction dict as JSON so the CSV writer
+                        # gets a plain string; the article text is already in
+                        # content_text and is not stored a second time
+                        'metadata_full': json.dumps(
+                            {k: v for k, v in content.items() if k != 'text'},
+                            ensure_ascii=False, default=str
+                        )
+                    }
+                    print(f"Successfully extracted: {report_data['title'][:50]}...")
+                    return report_data
+                else:
+                    print(f"No content extracted from {url}")
+                    # Record failed extraction
+                    return self._failure_row(url, 'Failed Extraction - No Content', 'No content extracted')
+            else:
+                print(f"Failed to download {url}")
+                # Record failed download
+                return self._failure_row(url, 'Failed Extraction - Download Error', 'Failed to download URL')
+        except Exception as e:
+            print(f"Error processing {url}: {e}")
+            # Add a failed record for tracking
+            return self._failure_row(url, 'Failed Extraction - Exception', str(e))
+
+    def collect_reports(self):
+        """Collect the reports using Trafilatura's bare_extraction"""
+        if not self.report_urls:
+            print("No URLs provided for collection")
+            return pd.DataFrame()
+
+        urls = self.report_urls[:self.MAX_REPORTS]
+        positions = [f"{i+1}/{len(urls)}" for i in range(len(urls))]
+        # One timestamp for the whole collection run
+        self._collected_at = datetime.now().isoformat()
+
+        # Downloads are network-bound, so they run in threads; each host gets
+        # MAX_REQUESTS_PER_HOST concurrent slots and a pause after every request
+        self._host_slots = {
+            urlsplit(url).netloc: threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST) for url in urls
+        }
+        self._cache_lock = threading.Lock()
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with shelve.open(str(self.cache_path)) as self._cache:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                columns = ResultColumns(REPORT_FIELDS)
+                for report in executor.map(self._collect_report, positions, urls):
+                    columns.append(report)
+
+        return columns.to_frame()
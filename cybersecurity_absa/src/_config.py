@@ -0,0 +1,29 @@
+# src/_config.py
+import configparser
+import os
+from functools import lru_cache
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent  # cybersecurity_absa/
+CONFIG_PATH = PROJECT_ROOT / 'config.ini'
+
+@lru_cache(maxsize=1)
+def load_config():
+    """
+    Parse the project's config.ini once per process. The parser is shared
+    by every caller, so treat it as read-only.
+    """
+    config = configparser.ConfigParser()
+    config.read(CONFIG_PATH)
+    return config
+
+def set_default_thread_env():
+    """
+    Default OMP_NUM_THREADS and MKL_NUM_THREADS unless the caller already
+    set them. Only takes effect when called before torch is imported.
+    """
+    # Half the logical CPUs is a guess at the physical core count on
+    # machines with two hardware threads per core; it is not read from the CPU
+    num_threads = str(max(1, (os.cpu_count() or 2) // 2))
+    os.environ.setdefault("OMP_NUM_THREADS", num_threads)
+    os.environ.setdefault("MKL_NUM_THREADS", num_threads)
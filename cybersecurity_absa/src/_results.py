@@ -0,0 +1,30 @@
+# src/_results.py
+import pandas as pd
+
+def count_mismatch(outputs, inputs):
+    """
+    Error message when outputs does not hold exactly one entry per input
+    (zip() would silently drop the rest), otherwise None.
+    """
+    if len(outputs) != len(inputs):
+        return f"expected {len(inputs)} results, got {len(outputs)}"
+    return None
+
+class ResultColumns:
+    """
+    Collect result records column by column and turn them into a DataFrame
+    once. Fields a record does not have are left empty, and the 'error'
+    column is dropped when no record failed.
+    """
+    def __init__(self, fields):
+        self.columns = {field: [] for field in fields}
+
+    def append(self, record):
+        for field, values in self.columns.items():
+            values.append(record.get(field))
+
+    def to_frame(self):
+        columns = dict(self.columns)
+        if all(error is None for error in columns.get('error', ())):
+            columns.pop('error', None)
+        return pd.DataFrame(columns)
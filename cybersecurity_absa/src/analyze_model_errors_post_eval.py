@@ -2,69 +2,93 @@
 import json
 from pathlib import Path
 
-def analyze_errors():
-    # Load the evaluation results
-    results_path = Path(__file__).parent.parent / 'evaluation_results.json'
-    
-    with open(results_path, 'r') as f:
-        evaluation_data = json.load(f)
-    
-    results = evaluation_data['results']
-    
-    # Filter for examples with errors
-    error_examples = []
-    for i, result in enumerate(results):
-        if 'error' in result:
-            error_examples.append((i, result))
-    
-    print(f"Found {len(error_examples)} examples with errors")
-    
-    # Load the original test dataset to compare
-    test_dataset_path = Path(__file__).parent.parent / 'data' / 'custom_cybersecurity_atepc' / 'test.dat.atepc'
-    
-    sentences = []
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# evaluate_model writes JSON lines; older runs left a single JSON dump
+RESULTS_PATH = PROJECT_ROOT / 'evaluation_results_fixed.jsonl'
+LEGACY_RESULTS_PATH = PROJECT_ROOT / 'evaluation_results.json'
+TEST_DATASET_PATH = PROJECT_ROOT / 'data' / 'custom_cybersecurity_atepc' / 'test.dat.atepc'
+
+def iter_sentences(path):
+    """Yield each sentence of an IOB file as its tokens joined by spaces."""
     current_sentence = []
-    
-    with open(test_dataset_path, 'r', encoding='utf-8') as f:
+    with open(path, 'r', encoding='utf-8') as f:
         for line in f:
             line = line.strip()
             if line == '':
                 if current_sentence:
-                    sentences.append(' '.join(current_sentence))
+                    yield ' '.join(current_sentence)
                     current_sentence = []
             else:
                 parts = line.split()
                 if len(parts) >= 1:
                     current_sentence.append(parts[0])
-        
-        if current_sentence:
-            sentences.append(' '.join(current_sentence))
     
-    # Show error examples
-    print("\nError Examples:")
-    for i, (idx, error_result) in enumerate(error_examples[:5]):  # Show first 5 errors
-        if idx < len(sentences):
-            print(f"\nError {i+1}:")
-            print(f"Sentence: {sentences[idx]}")
-            print(f"Error: {error_result['error']}")
+    if current_sentence:
+        yield ' '.join(current_sentence)
+
+def iter_results(path):
+    """
+    Yield evaluation results from either a JSON-lines file written by
+    evaluate_model (one result per line) or a single JSON dump with a 'results' list.
+    """
+    if path.suffix == '.jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        # Keep only the results list so the rest of the dump can be freed
+        with open(path, 'r') as f:
+            results = json.load(f)['results']
+        yield from results
+
+def analyze_errors():
+    results_path = RESULTS_PATH if RESULTS_PATH.exists() else LEGACY_RESULTS_PATH
+    results = iter_results(results_path)
+    
+    # Stream the original test dataset alongside the results instead of loading it
+    sentences = iter_sentences(TEST_DATASET_PATH)
     
-    # Analyze sentence length for errors vs successful examples
-    error_lengths = []
-    success_lengths = []
+    # Single pass over the results: count errors, keep the first 5 for display,
+    # and accumulate sentence length statistics without storing per-example lists
+    error_count = 0
+    error_examples = []
+    error_total = error_n = error_max = 0
+    success_total = success_n = success_max = 0
     
-    for i, result in enumerate(results):
-        if i < len(sentences):
-            sentence_length = len(sentences[i].split())
-            if 'error' in result:
-                error_lengths.append(sentence_length)
+    for result in results:
+        sentence = next(sentences, None)
+        is_error = 'error' in result
+        if is_error:
+            error_count += 1
+            if sentence is not None and len(error_examples) < 5:
+                error_examples.append((sentence, result))
+        
+        if sentence is not None:
+            sentence_length = len(sentence.split())
+            if is_error:
+                error_total += sentence_length
+                error_n += 1
+                error_max = max(error_max, sentence_length)
             else:
-                success_lengths.append(sentence_length)
+                success_total += sentence_length
+                success_n += 1
+                success_max = max(success_max, sentence_length)
+    
+    print(f"Found {error_count} examples with errors")
+    
+    # Show error examples
+    print("\nError Examples:")
+    for i, (sentence, error_result) in enumerate(error_examples):  # Show first 5 errors
+        print(f"\nError {i+1}:")
+        print(f"Sentence: {sentence}")
+        print(f"Error: {error_result['error']}")
     
     print("\nSentence Length Analysis:")
-    print(f"Average length of sentences with errors: {sum(error_lengths) / len(error_lengths):.1f} words")
-    print(f"Average length of successful sentences: {sum(success_lengths) / len(success_lengths):.1f} words")
-    print(f"Maximum length of sentences with errors: {max(error_lengths)} words")
-    print(f"Maximum length of successful sentences: {max(success_lengths)} words")
+    print(f"Average length of sentences with errors: {error_total / max(1, error_n):.1f} words")
+    print(f"Average length of successful sentences: {success_total / max(1, success_n):.1f} words")
+    print(f"Maximum length of sentences with errors: {error_max} words")
+    print(f"Maximum length of successful sentences: {success_max} words")
 
 if __name__ == "__main__":
-    analyze_errors()
\ No newline at end of file
+    analyze_errors()
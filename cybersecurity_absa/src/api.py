@@ -1,9 +1,24 @@
 # src/api.py
+import os
 from flask import Flask, request, jsonify
 from cybersecurity_atepc_inference import CybersecurityATEPC
 
 app = Flask(__name__)
-model = CybersecurityATEPC()
+# Skip key sorting and indentation when serializing responses; the default
+# provider does both, and pretty-prints every response while debug is on
+app.json.sort_keys = False
+app.json.compact = True
+# Loaded at import so that `gunicorn --preload -w N api:app` reads the weights
+# once in the master and the forked workers share those pages copy-on-write.
+# With several workers, set API_NUM_THREADS (e.g. cores / N) to cap the torch
+# thread pool of each one. API_PRECISION=bf16 or fp16 enables autocast.
+num_threads = os.environ.get('API_NUM_THREADS')
+model = CybersecurityATEPC(
+    num_threads=int(num_threads) if num_threads else None,
+    precision=os.environ.get('API_PRECISION') or None
+)
+# Largest batch_size a client may request for one forward pass
+MAX_BATCH_SIZE = int(os.environ.get('API_MAX_BATCH_SIZE', 128))
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
@@ -22,7 +37,17 @@ def batch_analyze():
         return jsonify({'error': 'No texts provided'}), 400
     
     texts = data['texts']
-    results = model.batch_analyze(texts)
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return jsonify({'error': 'texts must be a list of strings'}), 400
+
+    try:
+        batch_size = int(data.get('batch_size', min(32, MAX_BATCH_SIZE)))
+    except (TypeError, ValueError):
+        batch_size = 0
+    if not 0 < batch_size <= MAX_BATCH_SIZE:
+        return jsonify({'error': f'batch_size must be an integer from 1 to {MAX_BATCH_SIZE}'}), 400
+
+    results = model.batch_analyze(texts, batch_size=batch_size)
     return jsonify({'results': results})
 
 if __name__ == '__main__':
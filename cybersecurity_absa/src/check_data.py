@@ -1,16 +1,16 @@
+import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
-import configparser
+from _config import CONFIG_PATH, PROJECT_ROOT, load_config
+
+# Rows per chunk when streaming CSV files in check_file
+CSV_CHUNK_SIZE = 200_000
 
 def check_data_files():
     """Check if raw and processed data files exist and provide details."""
-    # Read configuration from project root
-    config = configparser.ConfigParser()
-    project_root = Path(__file__).parent.parent
-    config_path = project_root / 'config.ini'
-    print(f"Reading config from: {config_path}")
-
-    config.read(config_path)
+    config = load_config()
+    print(f"Reading config from: {CONFIG_PATH}")
     
     # Debugging: Print config sections
     print(f"Config sections: {config.sections()}")
@@ -21,8 +21,8 @@ def check_data_files():
 
     # Get directories relative to project root
     try:
-        raw_data_dir = project_root / config['paths']['raw_data_dir']
-        processed_data_dir = project_root / config['paths']['processed_data_dir']
+        raw_data_dir = PROJECT_ROOT / config['paths']['raw_data_dir']
+        processed_data_dir = PROJECT_ROOT / config['paths']['processed_data_dir']
     except KeyError as e:
         print(f"Error: Missing {e} key in config.ini 'paths' section.")
         return
@@ -33,32 +33,98 @@ def check_data_files():
     # --- Check RAW data files (all .xlsx, .xls) ---
     print("RAW DATA FILES:")
     print("-" * 30)
-    raw_files = list(raw_data_dir.glob("*.xlsx")) + list(raw_data_dir.glob("*.xls"))
+    raw_files = scan_directory(raw_data_dir, ('.xlsx', '.xls'))
     if not raw_files:
         print("  No Excel files (.xlsx/.xls) found in raw data directory.")
     else:
-        for file_path in sorted(raw_files):
-            check_file(file_path, "Raw")
+        for entry in raw_files:
+            check_file(Path(entry.path), "Raw", entry.stat().st_size)
 
     # --- Check PROCESSED data files (all .csv) ---
     print("\nPROCESSED DATA FILES:")
     print("-" * 30)
-    processed_files = list(processed_data_dir.glob("*.csv"))
+    processed_files = scan_directory(processed_data_dir, ('.csv',))
     if not processed_files:
         print("  No CSV files found in processed data directory.")
     else:
-        for file_path in sorted(processed_files):
-            check_file(file_path, "Processed")
+        for entry in processed_files:
+            check_file(Path(entry.path), "Processed", entry.stat().st_size)
+
+
+def scan_directory(directory, suffixes=None):
+    """
+    List directory entries sorted by name with a single directory read.
+
+    DirEntry objects cache their stat results, so callers can read sizes
+    without an extra syscall per file. When suffixes is given, only regular
+    files with a matching extension are returned.
+    """
+    if not directory.is_dir():
+        return []
+    with os.scandir(directory) as it:
+        entries = [
+            e for e in it
+            if suffixes is None
+            or (e.name.lower().endswith(suffixes) and e.is_file())
+        ]
+    return sorted(entries, key=lambda e: e.name)
+
+
+def count_missing(df):
+    """Count missing cells without materializing a boolean mask of the frame."""
+    return int(df.size - df.count().sum())
+
 
+def merge_dtypes(a, b):
+    """
+    Common dtype of a column inferred as a in one chunk and b in another:
+    the wider type when both are numeric, object otherwise.
+    """
+    if a == b:
+        return a
+    if (pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b)
+            and not pd.api.types.is_bool_dtype(a) and not pd.api.types.is_bool_dtype(b)):
+        return np.result_type(a, b)
+    return np.dtype(object)
 
-def check_file(file_path, file_type):
-    """Check individual file and print detailed information."""
+
+def scan_csv(file_path, chunksize=CSV_CHUNK_SIZE):
+    """
+    Stream a CSV file once in chunks.
+
+    Returns (row count, missing value count, first rows) where the first rows
+    carry the column names and the dtypes merged across all chunks.
+    """
+    num_rows = 0
+    missing_total = 0
+    head = None
+    dtypes = None
+    for chunk in pd.read_csv(file_path, chunksize=chunksize, memory_map=True):
+        if head is None:
+            head = chunk.head(1)
+            dtypes = chunk.dtypes.to_dict()
+        else:
+            dtypes = {col: merge_dtypes(dtype, chunk[col].dtype) for col, dtype in dtypes.items()}
+        num_rows += len(chunk)
+        missing_total += count_missing(chunk)
+    if head is not None:
+        head = head.astype(dtypes)
+    return num_rows, missing_total, head
+
+
+def check_file(file_path, file_type, file_size=None):
+    """
+    Check individual file and print detailed information.
+
+    file_size may be passed in from a directory scan to skip the stat calls.
+    """
     print(f"{file_type}: {file_path.name}")
     print(f"  Location: {file_path}")
     
-    if file_path.exists():
+    if file_size is not None or file_path.exists():
         try:
-            file_size = file_path.stat().st_size
+            if file_size is None:
+                file_size = file_path.stat().st_size
             print(f"Exists: Yes")
             print(f"Size: {file_size:,} bytes")
             
@@ -68,34 +134,36 @@ def check_file(file_path, file_type):
                 # Read file based on extension
                 suffix = file_path.suffix.lower()
                 if suffix == '.csv':
-                    df = pd.read_csv(file_path)
+                    # Only one chunk is held in memory at a time
+                    num_rows, missing_total, df = scan_csv(file_path)
                 elif suffix in ['.xlsx', '.xls']:
                     df = pd.read_excel(file_path)
+                    num_rows = len(df)
+                    missing_total = count_missing(df)
                 else:
                     print(f"Unsupported format: {suffix}")
                     print()
                     return
 
-                print(f"Records: {len(df):,}")
-                print(f"Columns: {len(df.columns)}")
+                cols = df.columns.tolist()
+                ncols = len(cols)
+                print(f"Records: {num_rows:,}")
+                print(f"Columns: {ncols}")
                 
-                if len(df) > 0:
+                if num_rows > 0:
                     # Show column names (truncated if too many)
-                    cols_to_show = df.columns[:10]
-                    if len(df.columns) > 10:
-                        print(f"Columns (first 10): {list(cols_to_show)}...")
+                    if ncols > 10:
+                        print(f"Columns (first 10): {cols[:10]}...")
                     else:
-                        print(f"Columns: {list(df.columns)}")
+                        print(f"Columns: {cols}")
                     
                     # Data types summary
                     dtype_summary = df.dtypes.value_counts()
                     print(f"Data types: {dict(dtype_summary)}")
                     
                     # Sample first row (first 5 columns)
-                    sample_cols = df.columns[:5]
                     sample_data = {}
-                    for col in sample_cols:
-                        val = df.iloc[0][col]
+                    for col, val in df.iloc[0, :5].to_dict().items():
                         val_str = str(val)
                         if len(val_str) > 50:
                             val_str = val_str[:50] + "..."
@@ -103,8 +171,7 @@ def check_file(file_path, file_type):
                     print(f"Sample row: {sample_data}")
                     
                     # Missing values
-                    missing_total = df.isnull().sum().sum()
-                    total_cells = len(df) * len(df.columns)
+                    total_cells = num_rows * ncols
                     missing_percent = (missing_total / total_cells) * 100 if total_cells > 0 else 0
                     print(f"Missing values: {missing_total:,} ({missing_percent:.1f}%)")
                     
@@ -118,13 +185,9 @@ def check_file(file_path, file_type):
 
 def check_directory_contents():
     """List all files in raw and processed directories (not just .csv/.xlsx)."""
-    config = configparser.ConfigParser()
-    project_root = Path(__file__).resolve().parent.parent
-    config_path = project_root / 'config.ini'
-    config.read(config_path)
-    
-    raw_data_dir = project_root / config['paths']['raw_data_dir']
-    processed_data_dir = project_root / config['paths']['processed_data_dir']
+    config = load_config()
+    raw_data_dir = PROJECT_ROOT / config['paths']['raw_data_dir']
+    processed_data_dir = PROJECT_ROOT / config['paths']['processed_data_dir']
     
     print("\n" + "=" * 60)
     print("DIRECTORY CONTENTS (ALL FILES):")
@@ -132,7 +195,7 @@ def check_directory_contents():
     
     print(f"\nRaw data directory ({raw_data_dir}):")
     if raw_data_dir.exists():
-        files = sorted(raw_data_dir.iterdir())
+        files = scan_directory(raw_data_dir)
         if files:
             for f in files:
                 size = f.stat().st_size
@@ -144,7 +207,7 @@ def check_directory_contents():
     
     print(f"\nProcessed data directory ({processed_data_dir}):")
     if processed_data_dir.exists():
-        files = sorted(processed_data_dir.iterdir())
+        files = scan_directory(processed_data_dir)
         if files:
             for f in files:
                 size = f.stat().st_size
@@ -1,15 +1,43 @@
 # src/collect_eurepoc.py
 import pandas as pd
-import configparser
+import numpy as np
+import os
+import re
 from pathlib import Path
+from _config import PROJECT_ROOT, load_config
+
+# Map the actual EuRepoC columns to our standard format
+_COLUMN_MAPPING = {
+    'id': 'ID',
+    'title': 'name',
+    'description': 'description', 
+    'date': 'start_date',
+    'incident_type': 'incident_type',
+    'severity': 'unweighted_cyber_intensity',
+    'receiver_country': 'receiver_country',
+    'receiver_category': 'receiver_category',
+    'initiator_country': 'initiator_country', 
+    'initiator_category': 'initiator_category',
+    'cyber_intensity': 'weighted_cyber_intensity',
+    'impact_indicator': 'impact_indicator',
+    'mitre_techniques': 'MITRE_initial_access',
+    'data_theft': 'data_theft',
+    'disruption': 'disruption',
+    'sources_url': 'sources_url'
+}
+
+# Raw columns process_incidents and analyze_dataset can use, under either
+# their EuRepoC or their standard name; other columns are not loaded
+_USED_COLUMNS = frozenset(_COLUMN_MAPPING) | frozenset(_COLUMN_MAPPING.values())
+
+# Dataset file names main() looks for: EuRepoC, eurepoc, Eurepoc, ...
+_RE_EUREPOC_NAME = re.compile(r'[eE]u[Rr]epo[Cc]')
 
 class EuRepoCDataCollector:
     def __init__(self):
-        # Read configuration from project root
-        self.config = configparser.ConfigParser()
-        self.project_root = Path(__file__).resolve().parent.parent  # cybersecurity_absa/
-        config_path = self.project_root / 'config.ini'
-        self.config.read(config_path)
+        # Read configuration from project root (parsed once per process)
+        self.config = load_config()
+        self.project_root = PROJECT_ROOT
 
     def load_local_dataset(self, file_path):
         """Load EuRepoC dataset from local CSV or Excel file"""
@@ -21,9 +49,9 @@ class EuRepoCDataCollector:
             
         try:
             if file_path.suffix.lower() == '.csv':
-                df = pd.read_csv(file_path)
+                df = pd.read_csv(file_path, usecols=lambda col: col in _USED_COLUMNS)
             elif file_path.suffix.lower() in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path)
+                df = pd.read_excel(file_path, usecols=lambda col: col in _USED_COLUMNS)
             else:
                 print(f"Error: Unsupported file format {file_path.suffix}")
                 return pd.DataFrame()
@@ -41,33 +69,15 @@ class EuRepoCDataCollector:
         if df.empty:
             return df
             
-        # Create a copy to avoid modifying the original
-        df_processed = df.copy()
-        
-        # Map the actual EuRepoC columns to our standard format
-        column_mapping = {
-            'id': 'ID',
-            'title': 'name',
-            'description': 'description', 
-            'date': 'start_date',
-            'incident_type': 'incident_type',
-            'severity': 'unweighted_cyber_intensity',
-            'receiver_country': 'receiver_country',
-            'receiver_category': 'receiver_category',
-            'initiator_country': 'initiator_country', 
-            'initiator_category': 'initiator_category',
-            'cyber_intensity': 'weighted_cyber_intensity',
-            'impact_indicator': 'impact_indicator',
-            'mitre_techniques': 'MITRE_initial_access',
-            'data_theft': 'data_theft',
-            'disruption': 'disruption',
-            'sources_url': 'sources_url'
+        # Rename columns to standard names in one step; a standard-named column
+        # already in the data is replaced by its EuRepoC counterpart. The
+        # result is a new frame, so the input is not modified.
+        rename_map = {
+            old_col: new_col for new_col, old_col in _COLUMN_MAPPING.items()
+            if old_col in df.columns and old_col != new_col
         }
-        
-        # Rename columns to standard names
-        for new_col, old_col in column_mapping.items():
-            if old_col in df_processed.columns:
-                df_processed[new_col] = df_processed[old_col]
+        replaced = [col for col in rename_map.values() if col in df.columns]
+        df_processed = df.drop(columns=replaced).rename(columns=rename_map)
         
         # Ensure essential columns exist
         essential_columns = ['title', 'description']
@@ -83,36 +93,42 @@ class EuRepoCDataCollector:
         if 'date' in df_processed.columns:
             df_processed['date'] = pd.to_datetime(df_processed['date'], errors='coerce')
         
+        # Each group of columns is converted in one block operation
+        def present(columns):
+            return [col for col in columns if col in df_processed.columns]
+        
         # Fill missing text values
-        text_columns = ['title', 'description', 'incident_type', 'receiver_country', 
-                       'initiator_country', 'receiver_category', 'initiator_category']
-        for col in text_columns:
-            if col in df_processed.columns:
-                df_processed[col] = df_processed[col].fillna('Unknown')
+        text_columns = present(['title', 'description', 'incident_type', 'receiver_country', 
+                                'initiator_country', 'receiver_category', 'initiator_category'])
+        if text_columns:
+            df_processed[text_columns] = df_processed[text_columns].fillna('Unknown')
         
         # Convert boolean columns
-        bool_columns = ['data_theft', 'disruption']
-        for col in bool_columns:
-            if col in df_processed.columns:
-                df_processed[col] = df_processed[col].fillna(False).astype(bool)
+        bool_columns = present(['data_theft', 'disruption'])
+        if bool_columns:
+            df_processed[bool_columns] = df_processed[bool_columns].fillna(False).astype(bool)
         
         # Convert numeric columns
-        numeric_columns = ['severity', 'cyber_intensity', 'impact_indicator']
-        for col in numeric_columns:
-            if col in df_processed.columns:
-                df_processed[col] = pd.to_numeric(df_processed[col], errors='coerce').fillna(0)
-        
-        # Create a combined impact description
+        numeric_columns = present(['severity', 'cyber_intensity', 'impact_indicator'])
+        if numeric_columns:
+            df_processed[numeric_columns] = (
+                df_processed[numeric_columns].apply(pd.to_numeric, errors='coerce').fillna(0)
+            )
+        
+        # Create a combined impact description for each incident from its own
+        # flags and impact level
         if all(col in df_processed.columns for col in ['data_theft', 'disruption', 'cyber_intensity']):
-            impact_parts = []
-            if df_processed['data_theft'].any():
-                impact_parts.append('Data Theft')
-            if df_processed['disruption'].any():
-                impact_parts.append('Service Disruption')
+            impact_parts = [
+                np.where(df_processed['data_theft'], 'Data Theft', ''),
+                np.where(df_processed['disruption'], 'Service Disruption', '')
+            ]
             if 'impact_indicator' in df_processed.columns:
-                impact_parts.append(f"Impact Level: {df_processed['impact_indicator'].mean():.1f}")
+                impact_parts.append(df_processed['impact_indicator'].map('Impact Level: {:.1f}'.format))
             
-            df_processed['impact_description'] = ' | '.join(impact_parts) if impact_parts else 'No significant impact'
+            df_processed['impact_description'] = [
+                ' | '.join(part for part in parts if part) or 'No significant impact'
+                for parts in zip(*impact_parts)
+            ]
         
         # Add source identifier
         df_processed['source'] = 'EuRepoC'
@@ -178,9 +194,15 @@ def main():
     raw_data_dir.mkdir(parents=True, exist_ok=True)
     processed_data_dir.mkdir(parents=True, exist_ok=True)
     
-    # Look for EuRepoC dataset files in the raw data directory
-    eurepoc_files = sorted(raw_data_dir.glob('*[eE]u[Rr]epo[Cc]*'), 
-                          key=lambda p: p.stat().st_mtime, reverse=True)
+    # Look for EuRepoC dataset files in the raw data directory, newest first,
+    # with one directory scan and one stat per matching entry
+    with os.scandir(raw_data_dir) as entries:
+        matches = [
+            (entry.stat().st_mtime, entry.path) for entry in entries
+            if _RE_EUREPOC_NAME.search(entry.name)
+        ]
+    matches.sort(reverse=True)
+    eurepoc_files = [Path(path) for _, path in matches]
     
     if not eurepoc_files:
         print("No EuRepoC dataset files found in raw data directory.")
@@ -189,8 +211,9 @@ def main():
         print("Expected filename pattern: *eurepoc* or *EuRepoC* (CSV or Excel format)")
         return
     
-    # Process each found file
-    for file_path in eurepoc_files:
+    # Every file would be written to the same eurepoc_processed.csv, so only
+    # the newest file that loads is processed; older ones are fallbacks
+    for position, file_path in enumerate(eurepoc_files):
         print(f"Processing EuRepoC dataset: {file_path.name}")
         
         # Load the dataset
@@ -219,6 +242,11 @@ def main():
                 sample_cols = [col for col in ['title', 'date', 'incident_type', 'receiver_country', 'severity'] 
                              if col in eurepoc_processed.columns]
                 print(eurepoc_processed[sample_cols].head(3))
+            
+            older_files = eurepoc_files[position + 1:]
+            if older_files:
+                print(f"Skipped older EuRepoC files: {', '.join(p.name for p in older_files)}")
+            break
         else:
             print(f"Failed to process {file_path.name}")
 
@@ -1,73 +1,117 @@
 # src/create_cybersecurity_atepc_dataset.py
 import pandas as pd
 import numpy as np
-from pathlib import Path
-import configparser
 import re
 import random
+from _config import PROJECT_ROOT, load_config
 
-def load_config():
-    """Load configuration from config.ini"""
-    config = configparser.ConfigParser()
-    config_path = Path(__file__).parent.parent / 'config.ini'
-    config.read(config_path)
-    return config
+# Common cybersecurity aspect patterns
+ASPECT_PATTERNS = [
+    r'vulnerability|vulnerabilities',
+    r'exploit|exploits|exploiting',
+    r'malware|viruses|trojans|ransomware|spyware',
+    r'phishing|phish',
+    r'data breach|data leak|information leak',
+    r'Ddos|DDoS|denial of service',
+    r'firewall|firewalls',
+    r'antivirus|anti-virus',
+    r'encryption|encrypt',
+    r'authentication|authenticating',
+    r'authorization|authorizing',
+    r'password|passwords',
+    r'patch|patches|patching',
+    r'update|updates|updating',
+    r'backup|backups',
+    r'network|networks',
+    r'server|servers',
+    r'database|databases',
+    r'system|systems',
+    r'security|secure',
+    r'threat|threats',
+    r'attack|attacks|attacking',
+    r'defense|defenses|defending',
+    r'protection|protecting',
+    r'detection|detecting',
+    r'prevention|preventing',
+    r'response|responding',
+    r'recovery|recovering',
+    r'incident|incidents',
+    r'breach|breaches',
+    r'intrusion|intrusions',
+    r'compromise|compromised',
+    r'hacker|hackers|hacking',
+    r'cyberattack|cyberattacks'
+]
+
+def _trie_pattern(terms):
+    """Build a regex alternation with shared prefixes factored out"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}  # end-of-term marker
+
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if optional else '')
+
+    return render(trie)
+
+# All aspect terms compiled into one prefix-factored alternation so each text
+# is scanned once and the engine branches per shared prefix instead of trying
+# every term at every word boundary. With the surrounding \b anchors at most
+# one term can match at a given position, so the result is the same as the
+# old per-pattern scan with overlaps dropped.
+ASPECT_TERMS = sorted({term.lower() for pattern in ASPECT_PATTERNS for term in pattern.split('|')})
+_ASPECT_RE = re.compile(r'\b' + _trie_pattern(ASPECT_TERMS) + r'\b', re.IGNORECASE)
 
 def extract_aspects_from_text(text):
     """
     Extract potential cybersecurity aspects from text using pattern matching
     """
-    # Common cybersecurity aspect patterns
-    aspect_patterns = [
-        r'\b(vulnerability|vulnerabilities)\b',
-        r'\b(exploit|exploits|exploiting)\b',
-        r'\b(malware|viruses|trojans|ransomware|spyware)\b',
-        r'\b(phishing|phish)\b',
-        r'\b(data breach|data leak|information leak)\b',
-        r'\b(Ddos|DDoS|denial of service)\b',
-        r'\b(firewall|firewalls)\b',
-        r'\b(antivirus|anti-virus)\b',
-        r'\b(encryption|encrypt)\b',
-        r'\b(authentication|authenticating)\b',
-        r'\b(authorization|authorizing)\b',
-        r'\b(password|passwords)\b',
-        r'\b(patch|patches|patching)\b',
-        r'\b(update|updates|updating)\b',
-        r'\b(backup|backups)\b',
-        r'\b(network|networks)\b',
-        r'\b(server|servers)\b',
-        r'\b(database|databases)\b',
-        r'\b(system|systems)\b',
-        r'\b(security|secure)\b',
-        r'\b(threat|threats)\b',
-        r'\b(attack|attacks|attacking)\b',
-        r'\b(defense|defenses|defending)\b',
-        r'\b(protection|protecting)\b',
-        r'\b(detection|detecting)\b',
-        r'\b(prevention|preventing)\b',
-        r'\b(response|responding)\b',
-        r'\b(recovery|recovering)\b',
-        r'\b(incident|incidents)\b',
-        r'\b(breach|breaches)\b',
-        r'\b(intrusion|intrusions)\b',
-        r'\b(compromise|compromised)\b',
-        r'\b(hacker|hackers|hacking)\b',
-        r'\b(cyberattack|cyberattacks)\b'
-    ]
-    
-    aspects = []
-    for pattern in aspect_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            aspects.append((match.group().lower(), match.start(), match.end()))
-    
-    # Sort by start position and remove overlaps
-    aspects = sorted(aspects, key=lambda x: x[1])
-    non_overlapping_aspects = []
-    for aspect in aspects:
-        if not non_overlapping_aspects or non_overlapping_aspects[-1][2] <= aspect[1]:
-            non_overlapping_aspects.append(aspect)
-    return non_overlapping_aspects
+    # finditer yields non-overlapping matches in position order
+    return [(match.group().lower(), match.start(), match.end()) for match in _ASPECT_RE.finditer(text)]
+
+# Positive sentiment indicators
+POSITIVE_WORDS = frozenset({
+    'effective', 'robust', 'secure', 'protected', 'safe', 'strong',
+    'reliable', 'successful', 'improved', 'enhanced', 'fixed', 'resolved',
+    'prevented', 'blocked', 'detected', 'mitigated', 'restored'
+})
+
+# Negative sentiment indicators
+NEGATIVE_WORDS = frozenset({
+    'vulnerable', 'compromised', 'breached', 'attacked', 'failed',
+    'weak', 'exploited', 'infected', 'corrupted', 'lost', 'stolen',
+    'unauthorized', 'malicious', 'dangerous', 'risky', 'insecure',
+    'disrupted', 'down', 'unavailable', 'crashed', 'hacked', 'encrypted',
+    'inaccessible', 'standstill', 'disaster', 'failure', 'sabotaged'
+})
+
+_WORD_RE = re.compile(r'\w+')
+
+def find_token_span(tokens, aspect_tokens):
+    """
+    Return the index of the first occurrence of aspect_tokens in tokens, or -1.
+    Both lists are expected to be lowercased already.
+    """
+    first = aspect_tokens[0]
+    span = len(aspect_tokens)
+    i = -1
+    while True:
+        try:
+            # list.index jumps straight to the next candidate start in C
+            i = tokens.index(first, i + 1)
+        except ValueError:
+            return -1
+        if span == 1 or tokens[i:i + span] == aspect_tokens:
+            return i
 
 def assign_sentiment_to_aspect(text, aspect, aspect_start, aspect_end):
     """
@@ -90,25 +134,10 @@ def assign_sentiment_to_aspect(text, aspect, aspect_start, aspect_end):
     context_end = min(len(words), end_word_idx + window_size)
     context = ' '.join(words[context_start:context_end])
     
-    # Positive sentiment indicators
-    positive_words = [
-        'effective', 'robust', 'secure', 'protected', 'safe', 'strong',
-        'reliable', 'successful', 'improved', 'enhanced', 'fixed', 'resolved',
-        'prevented', 'blocked', 'detected', 'mitigated', 'restored'
-    ]
-    
-    # Negative sentiment indicators
-    negative_words = [
-        'vulnerable', 'compromised', 'breached', 'attacked', 'failed',
-        'weak', 'exploited', 'infected', 'corrupted', 'lost', 'stolen',
-        'unauthorized', 'malicious', 'dangerous', 'risky', 'insecure',
-        'disrupted', 'down', 'unavailable', 'crashed', 'hacked', 'encrypted',
-        'inaccessible', 'standstill', 'disaster', 'failure', 'sabotaged'
-    ]
-    
-    # Count positive and negative words in context
-    positive_count = sum(1 for word in positive_words if word.lower() in context.lower())
-    negative_count = sum(1 for word in negative_words if word.lower() in context.lower())
+    # Count positive and negative indicator words present in the context
+    context_tokens = frozenset(_WORD_RE.findall(context.lower()))
+    positive_count = len(POSITIVE_WORDS & context_tokens)
+    negative_count = len(NEGATIVE_WORDS & context_tokens)
     
     # Determine sentiment
     if positive_count > negative_count:
@@ -119,31 +148,39 @@ def assign_sentiment_to_aspect(text, aspect, aspect_start, aspect_end):
         # Default to Neutral if counts are equal or no matches
         return 'Neutral'
 
-def clean_text(text):
-    """Clean text to ensure it's suitable for training"""
+_WS_RE = re.compile(r'\s+')
+
+def clean_text_series(texts):
+    """Clean a Series of texts to ensure they're suitable for training"""
     # Remove special characters that might cause issues, but keep essential punctuation
-    # text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\'\"\/\(\)]', ' ', text)
+    # texts = texts.str.replace(r'[^\w\s\.\,\!\?\;\:\-\'\"\/\(\)]', ' ', regex=True)
     # For IOB format, keeping punctuation attached to words might be fine, but extra spaces are not
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return texts.str.replace(_WS_RE, ' ', regex=True).str.strip()
 
 def create_atepc_dataset(input_file, output_dir, sample_size=1000):
     """
     Create a custom ATEPC dataset from cybersecurity text using IOB format.
     """
-    # Load the input data
-    df = pd.read_csv(input_file)
+    # Load the input data (only the text column is used)
+    df = pd.read_csv(input_file, usecols=['clean_text'])
     
     # Clean the text
-    df['clean_text'] = df['clean_text'].apply(clean_text)
+    df['clean_text'] = clean_text_series(df['clean_text'])
     
     # Remove empty texts
     df = df[df['clean_text'].str.len() > 10]
     
+    # Drop exact duplicates (syndicated articles, boilerplate advisories) so each
+    # text is annotated once and cannot land in more than one split
+    df = df.drop_duplicates(subset='clean_text')
+    
     # Sample texts if the dataset is large
     if len(df) > sample_size:
         df = df.sample(n=sample_size, random_state=42)
     
+    # Extract aspects for the whole column in one pass instead of per row inside the split loops
+    df = df.assign(aspects=df['clean_text'].map(extract_aspects_from_text))
+    
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
     
@@ -165,17 +202,14 @@ def create_atepc_dataset(input_file, output_dir, sample_size=1000):
         valid_samples = 0
         skipped_short_text = 0
         skipped_no_aspects = 0
+        lines = []
         
         with open(output_file, 'w', encoding='utf-8') as f:
-            for _, row in split_df.iterrows():
-                text = row['clean_text']
-                
+            for text, aspects in zip(split_df['clean_text'], split_df['aspects']):
                 # Skip texts that are too short
                 if len(text) < 20:
                     skipped_short_text += 1
                     continue
-                    
-                aspects = extract_aspects_from_text(text)
                 
                 if not aspects:
                     skipped_no_aspects += 1
@@ -187,43 +221,40 @@ def create_atepc_dataset(input_file, output_dir, sample_size=1000):
                 iob_tags = ['O'] * len(tokens)
                 sent_labels = ['0'] * len(tokens) # Default label
 
+                # Lowercase once per text rather than once per aspect and offset
+                lowered_tokens = [token.lower() for token in tokens]
+
                 # Apply aspect tags and sentiments
                 for aspect_text, start_char, end_char in aspects:
                     aspect_tokens = aspect_text.split()
                     # Find the start index of the aspect tokens in the full token list
-                    found = False
-                    for i in range(len(tokens)):
-                        if ' '.join(tokens[i:i+len(aspect_tokens)]).lower() == aspect_text.lower():
-                            # Assign B-ASP to the first token
-                            iob_tags[i] = 'B-ASP'
-                            # Assign I-ASP to subsequent tokens if more than one
-                            for j in range(1, len(aspect_tokens)):
-                                if i+j < len(iob_tags):
-                                    iob_tags[i+j] = 'I-ASP'
-                            
-                            # Determine sentiment for the whole aspect span
-                            sentiment_str = assign_sentiment_to_aspect(text, aspect_text, start_char, end_char)
-                            sentiment_num = label_map.get(sentiment_str, '0') # Default to Neutral if not found
+                    i = find_token_span(lowered_tokens, aspect_tokens)
+                    if i < 0:
+                        # print(f"Warning: Could not align aspect '{aspect_text}' in text: {text}")
+                        continue
 
-                            # Assign the determined sentiment to all tokens in the aspect span
-                            for j in range(len(aspect_tokens)):
-                                if i+j < len(sent_labels):
-                                    sent_labels[i+j] = sentiment_num
-                            
-                            found = True
-                            break # Move to the next aspect
-                    # if not found: # Optional: Log if an aspect couldn't be matched to tokens
-                    #     print(f"Warning: Could not align aspect '{aspect_text}' in text: {text}")
+                    # Assign B-ASP to the first token
+                    iob_tags[i] = 'B-ASP'
+                    # Assign I-ASP to subsequent tokens if more than one
+                    for j in range(1, len(aspect_tokens)):
+                        iob_tags[i+j] = 'I-ASP'
 
-                # Write the IOB format lines
-                for token, tag, label in zip(tokens, iob_tags, sent_labels):
-                    f.write(f"{token} {tag} {label}\n")
-                
-                # Add a blank line to separate sentences/documents
-                f.write("\n")
+                    # Determine sentiment for the whole aspect span
+                    sentiment_str = assign_sentiment_to_aspect(text, aspect_text, start_char, end_char)
+                    sentiment_num = label_map.get(sentiment_str, '0') # Default to Neutral if not found
+
+                    # Assign the determined sentiment to all tokens in the aspect span
+                    for j in range(len(aspect_tokens)):
+                        sent_labels[i+j] = sentiment_num
+
+                # Buffer the IOB format lines, followed by a blank line to separate sentences/documents
+                lines.extend(f"{token} {tag} {label}\n" for token, tag, label in zip(tokens, iob_tags, sent_labels))
+                lines.append("\n")
                 
                 valid_samples += 1 # Count sentences, not individual aspect occurrences
 
+            # Write the whole split in one call instead of once per token
+            f.writelines(lines)
 
         print(f"Created {split_name} dataset with {valid_samples} valid samples (sentences): {output_file}")
         print(f"  - Skipped {skipped_short_text} short/problematic texts")
@@ -250,15 +281,9 @@ def create_atepc_dataset(input_file, output_dir, sample_size=1000):
     return output_dir
 
 def main():
-    # Load configuration
-    config = configparser.ConfigParser()
-    config_path = Path(__file__).parent.parent / 'config.ini'
-    config.read(config_path)
-    
     # Get paths
-    project_root = Path(__file__).parent.parent
-    processed_data_dir = project_root / config['paths']['processed_data_dir']
-    custom_dataset_dir = project_root / 'data' / 'custom_cybersecurity_atepc'
+    processed_data_dir = PROJECT_ROOT / load_config()['paths']['processed_data_dir']
+    custom_dataset_dir = PROJECT_ROOT / 'data' / 'custom_cybersecurity_atepc'
     
     # Input file
     input_file = processed_data_dir / 'combined_dataset_with_topics.csv'
@@ -1,18 +1,71 @@
 # src/cybersecurity_atepc_inference.py
 from pyabsa import AspectTermExtraction as ATEPC
 from pathlib import Path
+from functools import lru_cache
+from contextlib import contextmanager
 import os
 import json
+import torch
+from _results import count_mismatch
+
+# Reduced-precision modes accepted by inference_context and CybersecurityATEPC
+AUTOCAST_DTYPES = {'bf16': torch.bfloat16, 'fp16': torch.float16}
+
+@contextmanager
+def inference_context(aspect_extractor, precision=None):
+    """
+    Run PyABSA predictions with autograd tracking disabled, and under
+    torch.autocast on the extractor's device when precision is 'bf16' or 'fp16'.
+    """
+    with torch.inference_mode():
+        if precision is None:
+            yield
+        else:
+            device_type = torch.device(aspect_extractor.config.device).type
+            with torch.autocast(device_type=device_type, dtype=AUTOCAST_DTYPES[precision]):
+                yield
+
+def quantize_dynamic_int8(aspect_extractor):
+    """
+    Replace the extractor's Linear layers with dynamically quantized int8
+    versions in place. Only applies to models on CPU with a quantized engine
+    available; returns True when the model was quantized.
+    """
+    if torch.device(aspect_extractor.config.device).type != 'cpu':
+        print("int8 quantization is CPU-only; keeping the fp32 model")
+        return False
+    engines = [e for e in torch.backends.quantized.supported_engines if e != 'none']
+    if not engines:
+        print("No quantized engine available on this CPU; keeping the fp32 model")
+        return False
+    aspect_extractor.model = torch.quantization.quantize_dynamic(
+        aspect_extractor.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return True
 
 class CybersecurityATEPC:
-    def __init__(self, checkpoint_path=None):
+    def __init__(self, checkpoint_path=None, cache_size=10000, num_threads=None, precision=None):
         """
         Initialize the Cybersecurity Aspect Term Extraction and Polarity Classification model.
         
         Args:
             checkpoint_path (str, optional): Path to the model checkpoint. 
                                            If None, uses the latest checkpoint.
+            cache_size (int, optional): Number of analyze_text results to keep
+                                        in the LRU cache. 0 disables caching.
+            num_threads (int, optional): Intra-op threads for torch. Set this when
+                                         running several worker processes per host
+                                         so they do not oversubscribe the CPU.
+            precision (str, optional): 'bf16' or 'fp16' to run predictions under
+                                       torch.autocast. None keeps full precision.
         """
+        if precision is not None and precision not in AUTOCAST_DTYPES:
+            raise ValueError(f"Unsupported precision: {precision}. Use one of {list(AUTOCAST_DTYPES)}")
+        self.precision = precision
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        
         self.aspect_extractor = None
         self.sentiment_map = {'-1': 'Negative', '0': 'Neutral', '1': 'Positive'}
         
@@ -38,10 +91,49 @@ class CybersecurityATEPC:
             print("Model loaded successfully!")
         except Exception as e:
             raise RuntimeError(f"Error loading model: {e}")
+        
+        # Repeated texts (retries, health checks, common phrases) skip the model.
+        # Bound per instance because lru_cache cannot hash self.
+        self._analyze_cached = lru_cache(maxsize=cache_size)(self._analyze_uncached)
+    
+    def _format_result(self, text, result):
+        """Map a raw PyABSA prediction to the aspect/sentiment/confidence shape."""
+        # Extract aspects, sentiments, and confidences
+        aspects = result.get('aspect', [])
+        sentiments = result.get('sentiment', [])
+        confidences = result.get('confidence', [])
+        
+        # Create a list of aspect-sentiment pairs
+        aspect_sentiments = []
+        for i, aspect in enumerate(aspects):
+            sentiment_label = self.sentiment_map.get(sentiments[i], sentiments[i])
+            confidence = confidences[i] if i < len(confidences) else "N/A"
+            aspect_sentiments.append({
+                "aspect": aspect,
+                "sentiment": sentiment_label,
+                "confidence": confidence
+            })
+        
+        return {
+            "text": text,
+            "aspects": aspect_sentiments
+        }
+    
+    def _analyze_uncached(self, text):
+        """Run the model on a single text. Exceptions propagate so they are not cached."""
+        with inference_context(self.aspect_extractor, self.precision):
+            result = self.aspect_extractor.predict(
+                text,
+                save_result=False,
+                print_result=False,
+                ignore_error=True
+            )
+        return self._format_result(text, result)
     
     def analyze_text(self, text):
         """
         Analyze a text to extract aspects and their sentiment polarities.
+        Results are cached per text, so the returned dict must not be mutated.
         
         Args:
             text (str): The text to analyze.
@@ -53,49 +145,53 @@ class CybersecurityATEPC:
             raise RuntimeError("Model not loaded. Call __init__ first.")
         
         try:
-            result = self.aspect_extractor.predict(
-                text,
-                save_result=False,
-                ignore_error=True
-            )
-            
-            # Extract aspects, sentiments, and confidences
-            aspects = result.get('aspect', [])
-            sentiments = result.get('sentiment', [])
-            confidences = result.get('confidence', [])
-            
-            # Create a list of aspect-sentiment pairs
-            aspect_sentiments = []
-            for i, aspect in enumerate(aspects):
-                sentiment_label = self.sentiment_map.get(sentiments[i], sentiments[i])
-                confidence = confidences[i] if i < len(confidences) else "N/A"
-                aspect_sentiments.append({
-                    "aspect": aspect,
-                    "sentiment": sentiment_label,
-                    "confidence": confidence
-                })
-            
-            return {
-                "text": text,
-                "aspects": aspect_sentiments
-            }
+            return self._analyze_cached(text)
         except Exception as e:
             return {
                 "text": text,
                 "error": str(e)
             }
     
-    def batch_analyze(self, texts):
+    def cache_info(self):
+        """Return hit/miss statistics of the analyze_text cache."""
+        return self._analyze_cached.cache_info()
+    
+    def batch_analyze(self, texts, batch_size=32):
         """
-        Analyze a batch of texts.
+        Analyze a batch of texts. The texts are predicted together in one
+        call and do not go through the analyze_text cache.
         
         Args:
             texts (list): A list of texts to analyze.
+            batch_size (int): Number of texts per forward pass.
             
         Returns:
             list: A list of dictionaries, each containing the analysis for one text.
         """
-        return [self.analyze_text(text) for text in texts]
+        if self.aspect_extractor is None:
+            raise RuntimeError("Model not loaded. Call __init__ first.")
+        
+        if not texts:
+            return []
+        
+        # One predict call for the whole list lets PyABSA batch the forward passes
+        try:
+            with inference_context(self.aspect_extractor, self.precision):
+                results = self.aspect_extractor.predict(
+                    list(texts),
+                    save_result=False,
+                    print_result=False,
+                    ignore_error=True,
+                    eval_batch_size=batch_size
+                )
+        except Exception as e:
+            return [{"text": text, "error": str(e)} for text in texts]
+        
+        error = count_mismatch(results, texts)
+        if error:
+            return [{"text": text, "error": error} for text in texts]
+        
+        return [self._format_result(text, result) for text, result in zip(texts, results)]
 
 def main():
     # Example usage
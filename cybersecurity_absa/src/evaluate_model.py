@@ -1,17 +1,26 @@
 # src/evaluate_model.py
 from pyabsa import AspectTermExtraction as ATEPC
+from cybersecurity_atepc_inference import AUTOCAST_DTYPES, inference_context
 from pathlib import Path
 import os
 import re
 import sys
 import io
+import gc
+import json
+import torch
 
 # Set stdout to handle UTF-8 properly
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+# Batches between releases of the CUDA caching allocator's unused blocks
+EMPTY_CACHE_EVERY = 50
+
+_APC_F1_RE = re.compile(r'apcf1_(\d+\.\d+)')
+
 def get_apc_f1_from_name(dirname):
     """Extract APC F1 score from directory name"""
-    match = re.search(r'apcf1_(\d+\.\d+)', dirname)
+    match = _APC_F1_RE.search(dirname)
     if match:
         return float(match.group(1))
     return 0.0
@@ -23,16 +32,15 @@ def parse_iob_file(file_path):
     
     with open(file_path, 'r', encoding='utf-8') as f:
         for line in f:
-            line = line.strip()
-            if line == '':
-                if current_sentence:
-                    sentences.append(' '.join(current_sentence))
-                    current_sentence = []
-            else:
-                # Each line contains token and IOB tag, separated by space
-                parts = line.split()
-                if len(parts) >= 1:
-                    current_sentence.append(parts[0])
+            # Each line contains token and IOB tag, separated by space; only the
+            # token is needed, so split once instead of stripping and splitting fully
+            parts = line.split(None, 1)
+            if parts:
+                current_sentence.append(parts[0])
+            elif current_sentence:
+                # Blank line ends the sentence
+                sentences.append(' '.join(current_sentence))
+                current_sentence = []
         
         # Add the last sentence if file doesn't end with empty line
         if current_sentence:
@@ -40,7 +48,19 @@ def parse_iob_file(file_path):
     
     return sentences
 
-def evaluate_model():
+def evaluate_model(precision=None, batch_size=32):
+    """
+    Evaluate the best custom ATEPC checkpoint on the test split.
+
+    Args:
+        batch_size (int, optional): Sentences per batch_predict call and per
+                                    forward pass. Raise it on GPUs with spare memory.
+        precision (str, optional): 'bf16' or 'fp16' to run inference under
+                                   torch.autocast. None keeps full precision.
+    """
+    if precision is not None and precision not in AUTOCAST_DTYPES:
+        raise ValueError(f"Unsupported precision: {precision}. Use one of {list(AUTOCAST_DTYPES)}")
+    
     # Find the best checkpoint directory based on APC F1 score
     project_root = Path(__file__).parent.parent.parent
     checkpoints_dir = project_root / 'checkpoints'
@@ -48,22 +68,28 @@ def evaluate_model():
     if not checkpoints_dir.exists():
         raise FileNotFoundError(f"Checkpoints directory not found at {checkpoints_dir}")
     
-    # Get all checkpoint directories that start with "fast_lcf_atepc_custom_dataset"
-    checkpoint_dirs = [
-        d for d in checkpoints_dir.iterdir() 
-        if d.is_dir() and d.name.startswith("fast_lcf_atepc_custom_dataset")
-    ]
-    
-    if not checkpoint_dirs:
+    # Pick the checkpoint directory with the best APC F1 score (higher is better)
+    # in one pass over the directory entries
+    with os.scandir(checkpoints_dir) as entries:
+        best_entry = max(
+            (
+                e for e in entries
+                if e.is_dir() and e.name.startswith("fast_lcf_atepc_custom_dataset")
+            ),
+            key=lambda e: get_apc_f1_from_name(e.name),
+            default=None
+        )
+    
+    if best_entry is None:
         raise FileNotFoundError(f"No checkpoint directories found in {checkpoints_dir}")
     
-    # Sort by APC F1 score (higher is better)
-    checkpoint_dirs.sort(key=lambda d: get_apc_f1_from_name(d.name), reverse=True)
-    best_checkpoint = checkpoint_dirs[0]
+    best_checkpoint = Path(best_entry.path)
     apc_f1 = get_apc_f1_from_name(best_checkpoint.name)
     
     print(f"Using best checkpoint: {best_checkpoint}")
     print(f"APC F1 score: {apc_f1}")
+    if precision is not None:
+        print(f"Inference precision: {precision} (autocast)")
     
     # Load the model for inference
     try:
@@ -84,45 +110,64 @@ def evaluate_model():
     sentences = parse_iob_file(test_dataset_path)
     print(f"Found {len(sentences)} sentences in test dataset")
     
-    # Process in batches to avoid memory issues
-    batch_size = 32
-    all_results = []
+    # Results are written one JSON object per line as each batch finishes and
+    # the summary counters are updated on the fly, so only the current batch
+    # (plus the first few results for display) is held in memory
+    output_dir = Path(__file__).parent.parent
+    results_path = output_dir / 'evaluation_results_fixed.jsonl'
+    summary_path = output_dir / 'evaluation_results_fixed_summary.json'
     
-    for i in range(0, len(sentences), batch_size):
-        batch = sentences[i:i+batch_size]
-        print(f"Processing batch {i//batch_size + 1}/{(len(sentences)-1)//batch_size + 1}")
-        
-        try:
-            batch_results = aspect_extractor.batch_predict(
-                batch,
-                save_result=False,
-                ignore_error=True
-            )
-            all_results.extend(batch_results)
-        except Exception as e:
-            print(f"Error processing batch {i//batch_size + 1}: {e}")
-            # Add empty results for failed batch
-            all_results.extend([{"error": str(e)}] * len(batch))
-    
-    # Process results
-    total_examples = len(all_results)
+    total_examples = 0
     total_aspects = 0
     sentiment_distribution = {'-1': 0, '0': 0, '1': 0}
     error_count = 0
+    example_results = []
     
-    for result in all_results:
-        if 'error' in result:
-            error_count += 1
-            continue
+    # Process in batches to avoid memory issues
+    with open(results_path, 'w', encoding='utf-8') as f:
+        for i in range(0, len(sentences), batch_size):
+            batch = sentences[i:i+batch_size]
+            print(f"Processing batch {i//batch_size + 1}/{(len(sentences)-1)//batch_size + 1}")
             
-        aspects = result.get('aspect', [])
-        sentiments = result.get('sentiment', [])
-        
-        total_aspects += len(aspects)
-        
-        for sentiment in sentiments:
-            if sentiment in sentiment_distribution:
-                sentiment_distribution[sentiment] += 1
+            try:
+                # Printing every prediction to the console stalls the loop between
+                # forward passes (and fails on consoles that cannot encode the text)
+                with inference_context(aspect_extractor, precision):
+                    batch_results = aspect_extractor.batch_predict(
+                        batch,
+                        save_result=False,
+                        print_result=False,
+                        ignore_error=True,
+                        eval_batch_size=batch_size
+                    )
+            except Exception as e:
+                print(f"Error processing batch {i//batch_size + 1}: {e}")
+                # Add empty results for failed batch
+                batch_results = [{"error": str(e)}] * len(batch)
+            
+            for result in batch_results:
+                # ensure_ascii=False to properly handle Unicode
+                f.write(json.dumps(result, ensure_ascii=False) + '\n')
+                
+                total_examples += 1
+                if len(example_results) < 5:
+                    example_results.append(result)
+                
+                if 'error' in result:
+                    error_count += 1
+                    continue
+                
+                total_aspects += len(result.get('aspect', []))
+                for sentiment in result.get('sentiment', []):
+                    if sentiment in sentiment_distribution:
+                        sentiment_distribution[sentiment] += 1
+            
+            # On long runs, periodically hand cached GPU blocks back so memory
+            # use stays flat for other processes sharing the device
+            batch_number = i // batch_size + 1
+            if batch_number % EMPTY_CACHE_EVERY == 0 and torch.cuda.is_available():
+                gc.collect()
+                torch.cuda.empty_cache()
     
     print("\nEvaluation Results:")
     print(f"Total examples processed: {total_examples}")
@@ -134,11 +179,8 @@ def evaluate_model():
     print(f"  Neutral (0): {sentiment_distribution['0']} ({sentiment_distribution['0'] / max(1, total_aspects) * 100:.1f}%)")
     print(f"  Positive (1): {sentiment_distribution['1']} ({sentiment_distribution['1'] / max(1, total_aspects) * 100:.1f}%)")
     
-    # Save results to a file with UTF-8 encoding
-    output_path = Path(__file__).parent.parent / 'evaluation_results_fixed.json'
-    import json
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
+    # Save the summary to a small separate file with UTF-8 encoding
+    with open(summary_path, 'w', encoding='utf-8') as f:
         json.dump({
             'checkpoint': str(best_checkpoint),
             'apc_f1': apc_f1,
@@ -147,14 +189,15 @@ def evaluate_model():
             'average_aspects_per_example': total_aspects / max(1, total_examples - error_count),
             'error_count': error_count,
             'sentiment_distribution': sentiment_distribution,
-            'results': all_results
-        }, f, indent=2, ensure_ascii=False)  # ensure_ascii=False to properly handle Unicode
+            'results_file': results_path.name
+        }, f, indent=2, ensure_ascii=False)
     
-    print(f"\nDetailed results saved to: {output_path}")
+    print(f"\nDetailed results saved to: {results_path}")
+    print(f"Summary saved to: {summary_path}")
     
     # Show some example results
     print("\nExample Results:")
-    for i, result in enumerate(all_results[:5]):
+    for i, result in enumerate(example_results):
         if 'error' not in result:
             print(f"\nExample {i+1}: {result['sentence']}")
             aspects = result.get('aspect', [])
@@ -167,4 +210,8 @@ def evaluate_model():
                 print(f"  - {aspect}: {sentiment} (Confidence: {confidence})")
     
 if __name__ == "__main__":
-    evaluate_model()
\ No newline at end of file
+    # EVAL_PRECISION=bf16 or fp16 evaluates under autocast; EVAL_BATCH_SIZE overrides the batch size
+    evaluate_model(
+        precision=os.environ.get('EVAL_PRECISION') or None,
+        batch_size=int(os.environ.get('EVAL_BATCH_SIZE') or 32)
+    )
\ No newline at end of file
@@ -1,22 +1,15 @@
 # src/initialize_pyabsa.py
-from pyabsa import AspectTermExtraction as ATEPC
-import configparser
 import os
-from pathlib import Path
-
-# Add BERTopic imports
-from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
-from umap import UMAP
-from hdbscan import HDBSCAN
-from bertopic.representation import KeyBERTInspired
+from _config import CONFIG_PATH, load_config
 
 # Load configuration with correct path
-config = configparser.ConfigParser()
-config_path = Path(__file__).parent.parent / 'config.ini'  # Go up one level from src/
-config.read(config_path)
+config = load_config()
 
 def initialize_pyabsa():
+    # PyABSA (and with it torch/transformers) is only imported when a model is
+    # actually requested, so importing this module for its config stays cheap
+    from pyabsa import AspectTermExtraction as ATEPC
+    
     # Initialize PyABSA with cybersecurity-optimized settings
     pyabsa_config = ATEPC.ATEPCConfigManager.get_atepc_config_english()
 
@@ -33,12 +26,13 @@ def initialize_pyabsa():
     return aspect_extractor, pyabsa_config
 
 # Test the configuration
-try:
-    aspect_extractor, pyabsa_config = initialize_pyabsa()
-    print(f"PyABSA environment configured successfully")
-    print(f"Using model: {config['models']['pretrained_bert']}")
-except KeyError as e:
-    print(f"Configuration error: {e}")
-    print(f"Available sections: {config.sections()}")
-    print(f"Config file path: {config_path}")
-    print(f"Current working directory: {os.getcwd()}")
\ No newline at end of file
+if __name__ == "__main__":
+    try:
+        aspect_extractor, pyabsa_config = initialize_pyabsa()
+        print(f"PyABSA environment configured successfully")
+        print(f"Using model: {config['models']['pretrained_bert']}")
+    except KeyError as e:
+        print(f"Configuration error: {e}")
+        print(f"Available sections: {config.sections()}")
+        print(f"Config file path: {CONFIG_PATH}")
+        print(f"Current working directory: {os.getcwd()}")
\ No newline at end of file
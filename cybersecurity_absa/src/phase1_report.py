@@ -1,14 +1,12 @@
 # src/phase1_report.py
-import configparser
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
+from _config import load_config
 
 def generate_phase1_report():
-    # Read configuration with correct path
-    config = configparser.ConfigParser()
-    config_path = Path(__file__).parent.parent / 'config.ini'
-    config.read(config_path)
+    # Read configuration (parsed once per process)
+    config = load_config()
     
     # Get paths from config
     processed_data_dir = Path(config['paths']['processed_data_dir'])
@@ -19,8 +17,9 @@ def generate_phase1_report():
     
     try:
         # Load key outputs
-        combined_df = pd.read_csv(processed_data_dir / 'dataset_with_bertopics.csv')
-        baseline_results_df = pd.read_csv(processed_data_dir / 'baseline_aspect_extraction.csv')
+        # Only the topic ids and the success flags are needed for the metrics below
+        combined_df = pd.read_csv(processed_data_dir / 'dataset_with_bertopics.csv', usecols=['bertopic_id'])
+        baseline_results_df = pd.read_csv(processed_data_dir / 'baseline_aspect_extraction.csv', usecols=['success'])
         
         # Calculate metrics
         total_records = len(combined_df)
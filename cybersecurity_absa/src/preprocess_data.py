@@ -1,20 +1,75 @@
 # src/preprocess_data.py
 import pandas as pd
+import numpy as np
+import os
 import re
-import configparser
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from _config import CONFIG_PATH, PROJECT_ROOT, load_config
+
+# Keep letters, digits, whitespace, hyphens, and periods (for terms like "zero-day")
+_RE_NONWORD = re.compile(r'[^\w\s\-\.]')
+# Same replacement for ASCII text as a translate table, which is much faster
+# than the regex; text with other characters still goes through _RE_NONWORD
+_ASCII_NONWORD_TABLE = str.maketrans({
+    chr(c): ' ' for c in range(128)
+    if not (chr(c).isalnum() or chr(c).isspace() or chr(c) in '_-.')
+})
+_RE_WS = re.compile(r'\s+')
+# Basic stop words removed by clean_text
+_STOP_WORDS = frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+# Stop words as whole whitespace-delimited tokens, for column-wise cleaning
+_RE_STOP_WORDS = re.compile(r'(?<!\S)(?:' + '|'.join(sorted(_STOP_WORDS)) + r')(?!\S)')
+
+# Fallback records used by create_sample_data when no collected data exists
+_SAMPLE_ROWS = [
+    {
+        'id': 0,
+        'title': 'Ransomware Attack on Healthcare System',
+        'content_text': 'A major ransomware attack targeted a healthcare system, encrypting patient records and demanding payment. The attack exploited vulnerabilities in the firewall configuration.',
+        'source': 'sample',
+        'date': '2024-01-15'
+    },
+    {
+        'title': 'Phishing Campaign Targets Financial Institutions',
+        'content_text': 'A sophisticated phishing campaign targeted multiple financial institutions, using social engineering to bypass authentication systems. Incident response teams were activated.',
+        'source': 'sample',
+        'date': '2024-01-20'
+    },
+    {
+        'title': 'Vulnerability in Encryption Software Discovered',
+        'content_text': 'Security researchers discovered a critical vulnerability in widely used encryption software that could allow threat actors to bypass security controls.',
+        'source': 'sample',
+        'date': '2024-01-25'
+    },
+    {
+        'title': 'Malware Infection via Supply Chain Attack',
+        'content_text': 'A supply chain attack resulted in malware being distributed through legitimate software updates. Intrusion detection systems failed to identify the threat initially.',
+        'source': 'sample',
+        'date': '2024-02-01'
+    },
+    {
+        'title': 'Data Breach Exposes Customer Information',
+        'content_text': 'A data breach at a major corporation exposed sensitive customer information. The breach was caused by inadequate patch management and weak security controls.',
+        'source': 'sample',
+        'date': '2024-02-05'
+    }
+]
+
+@lru_cache(maxsize=None)
+def _sample_df():
+    """Build the sample DataFrame once; callers get copies"""
+    return pd.DataFrame(_SAMPLE_ROWS)
 
 class DataPreprocessor:
     def __init__(self):
         # Resolve project root: cybersecurity_absa/
-        self.project_root = Path(__file__).parent.parent
-        config_path = self.project_root / 'config.ini'
+        self.project_root = PROJECT_ROOT
         
-        if not config_path.exists():
-            raise FileNotFoundError(f"Config file not found at: {config_path}")
+        if not CONFIG_PATH.exists():
+            raise FileNotFoundError(f"Config file not found at: {CONFIG_PATH}")
         
-        self.config = configparser.ConfigParser()
-        self.config.read(config_path)
+        self.config = load_config()
         
         # Validate config has 'paths' section
         if 'paths' not in self.config:
@@ -32,62 +87,111 @@ class DataPreprocessor:
             'ransomware', 'phishing', 'malware', 'encryption', 'authentication',
             'incident response', 'security controls', 'threat intelligence'
         ]
+        # Bit i of cyber_terms_bits is set when cybersecurity_terms[i] occurs in the text
+        self._term_bit_weights = (1 << np.arange(len(self.cybersecurity_terms))).astype(
+            np.min_scalar_type((1 << len(self.cybersecurity_terms)) - 1)
+        )
 
     def clean_text(self, text):
         """Clean and normalize text data"""
         if not isinstance(text, str) or not text.strip():
             return ""
         text = text.lower()
-        # Keep letters, digits, whitespace, hyphens, and periods (for terms like "zero-day")
-        text = re.sub(r'[^\w\s\-\.]', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        # Remove basic stop words
-        stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        text = ' '.join(word for word in text.split() if word not in stop_words)
+        text = text.translate(_ASCII_NONWORD_TABLE) if text.isascii() else _RE_NONWORD.sub(' ', text)
+        # Remove basic stop words, then collapse the whitespace left behind
+        text = _RE_STOP_WORDS.sub(' ', text)
+        text = _RE_WS.sub(' ', text).strip()
         return text
 
+    def clean_text_series(self, texts):
+        """Apply clean_text to a whole Series using pandas string operations"""
+        try:
+            lowered = texts.str.lower()
+            cleaned = lowered.str.translate(_ASCII_NONWORD_TABLE)
+            # Only texts with non-ASCII characters need the Unicode-aware regex
+            non_ascii = lowered.map(lambda t: isinstance(t, str) and not t.isascii()).astype(bool)
+            if non_ascii.any():
+                cleaned[non_ascii] = lowered[non_ascii].str.replace(_RE_NONWORD, ' ', regex=True)
+            cleaned = (
+                cleaned
+                .str.replace(_RE_STOP_WORDS, ' ', regex=True)
+                .str.replace(_RE_WS, ' ', regex=True)
+                .str.strip()
+            )
+        except AttributeError:
+            # Columns with no string values do not support the .str accessor
+            # (object dtype keeps an empty result usable with .str as well)
+            return texts.apply(self.clean_text).astype(object)
+        # Non-string values (NaN, numbers) become empty strings, as in clean_text
+        return cleaned.fillna('')
+
+    def bits_to_terms(self, bits):
+        """Return the cybersecurity terms encoded in a cyber_terms_bits value"""
+        bits = int(bits)
+        return [term for i, term in enumerate(self.cybersecurity_terms) if bits >> i & 1]
+
     def preprocess_dataframe(self, df, source_name="unknown"):
         """Preprocess a cybersecurity dataframe"""
         if df.empty:
             print(f"Warning: Empty dataframe for source '{source_name}'")
             return df
 
-        df_processed = df.copy()
-        
         # Determine text column
         text_col = None
         for candidate in ['content_text', 'description', 'text', 'summary']:
-            if candidate in df_processed.columns:
+            if candidate in df.columns:
                 text_col = candidate
                 break
         
         if text_col is None:
             print(f"Warning: No suitable text column found in {source_name}. Available columns: {list(df.columns)}")
-            df_processed['clean_text'] = ""
-            df_processed['cyber_terms'] = [[] for _ in range(len(df_processed))]
-            df_processed['text_length'] = 0
-            df_processed['cyber_term_count'] = 0
-            return df_processed
+            return df.assign(
+                clean_text="",
+                cyber_terms_bits=np.zeros(len(df), dtype=self._term_bit_weights.dtype),
+                text_length=0,
+                cyber_term_count=0
+            )
+
+        # Cleaning never makes lowercased text longer, so rows that are already
+        # too short once lowercased (or hold no text) are dropped before the
+        # regex passes run
+        texts = df[text_col]
+        try:
+            candidates = (texts.str.lower().str.len() > 50).to_numpy(dtype=bool)
+        except AttributeError:
+            # Columns with no string values clean to empty strings
+            candidates = np.zeros(len(df), dtype=bool)
 
         # Clean text
-        df_processed['clean_text'] = df_processed[text_col].apply(self.clean_text)
+        clean_text = self.clean_text_series(texts[candidates])
+        
+        # Filter out very short texts (< 50 characters) first, so term
+        # extraction only runs on the rows that are kept
+        text_length = clean_text.str.len()
+        long_enough = text_length > 50
+        clean_text = clean_text[long_enough]
+        text_length = text_length[long_enough]
+        keep = candidates.copy()
+        keep[candidates] = long_enough.to_numpy(dtype=bool)
+        filtered_count = int(keep.sum())
+        if filtered_count < len(df):
+            print(f"Filtered out {len(df) - filtered_count} short records from {source_name}")
+
+        # Extract cybersecurity terms: one presence mask per term (rows x terms),
+        # packed into a bitmask column (see bits_to_terms) and summed for the counts
+        term_hits = np.column_stack([
+            clean_text.str.contains(term, regex=False).to_numpy(dtype=bool)
+            for term in self.cybersecurity_terms
+        ])
         
-        # Extract cybersecurity terms
-        def extract_cyber_terms(text):
-            if not isinstance(text, str):
-                return []
-            return [term for term in self.cybersecurity_terms if term in text]
-
-        df_processed['cyber_terms'] = df_processed['clean_text'].apply(extract_cyber_terms)
-        df_processed['text_length'] = df_processed['clean_text'].str.len()
-        df_processed['cyber_term_count'] = df_processed['cyber_terms'].apply(len)
-
-        # Filter out very short texts (< 50 characters)
-        initial_count = len(df_processed)
-        df_processed = df_processed[df_processed['text_length'] > 50].copy()
-        filtered_count = len(df_processed)
-        if filtered_count < initial_count:
-            print(f"Filtered out {initial_count - filtered_count} short records from {source_name}")
+        # The filtered selection is the only copy of the input; the derived
+        # columns are added to it in a single assign
+        df_processed = df[keep].assign(
+            clean_text=clean_text,
+            cyber_terms_bits=(term_hits * self._term_bit_weights).sum(axis=1, dtype=self._term_bit_weights.dtype),
+            text_length=text_length,
+            cyber_term_count=term_hits.sum(axis=1)
+        )
 
         return df_processed
 
@@ -112,40 +216,7 @@ class DataPreprocessor:
         """Create sample cybersecurity data for testing (fallback only)"""
         print("Creating SAMPLE data for testing (no real data found)...")
         
-        sample_data = [
-            {
-                'id': 0,
-                'title': 'Ransomware Attack on Healthcare System',
-                'content_text': 'A major ransomware attack targeted a healthcare system, encrypting patient records and demanding payment. The attack exploited vulnerabilities in the firewall configuration.',
-                'source': 'sample',
-                'date': '2024-01-15'
-            },
-            {
-                'title': 'Phishing Campaign Targets Financial Institutions',
-                'content_text': 'A sophisticated phishing campaign targeted multiple financial institutions, using social engineering to bypass authentication systems. Incident response teams were activated.',
-                'source': 'sample',
-                'date': '2024-01-20'
-            },
-            {
-                'title': 'Vulnerability in Encryption Software Discovered',
-                'content_text': 'Security researchers discovered a critical vulnerability in widely used encryption software that could allow threat actors to bypass security controls.',
-                'source': 'sample',
-                'date': '2024-01-25'
-            },
-            {
-                'title': 'Malware Infection via Supply Chain Attack',
-                'content_text': 'A supply chain attack resulted in malware being distributed through legitimate software updates. Intrusion detection systems failed to identify the threat initially.',
-                'source': 'sample',
-                'date': '2024-02-01'
-            },
-            {
-                'title': 'Data Breach Exposes Customer Information',
-                'content_text': 'A data breach at a major corporation exposed sensitive customer information. The breach was caused by inadequate patch management and weak security controls.',
-                'source': 'sample',
-                'date': '2024-02-05'
-            }
-        ]
-        return pd.DataFrame(sample_data)
+        return _sample_df().copy()
 
 
 def main():
@@ -169,7 +240,7 @@ def main():
             file_path = preprocessor.processed_data_dir / filename
             if file_path.exists() and file_path.stat().st_size > 0:
                 try:
-                    df = pd.read_csv(file_path)
+                    df = pd.read_csv(file_path, memory_map=True)
                     if not df.empty:
                         print(f"{source_name}: {len(df)} records loaded")
                         datasets.append((source_name, df))
@@ -186,11 +257,19 @@ def main():
             sample_df = preprocessor.create_sample_data()
             datasets = [('Sample', sample_df)]
 
-        # Preprocess each dataset
+        # Preprocess each dataset; sources are independent, so they are cleaned
+        # in separate processes when there is more than one
         print("\nPreprocessing datasets...")
+        source_names = [source_name for source_name, _ in datasets]
+        source_dfs = [df for _, df in datasets]
+        if len(datasets) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(datasets), os.cpu_count() or 1)) as executor:
+                results = list(executor.map(preprocessor.preprocess_dataframe, source_dfs, source_names))
+        else:
+            results = [preprocessor.preprocess_dataframe(source_dfs[0], source_name=source_names[0])]
+        
         processed_dfs = []
-        for source_name, df in datasets:
-            processed_df = preprocessor.preprocess_dataframe(df, source_name=source_name)
+        for source_name, processed_df in zip(source_names, results):
             if not processed_df.empty:
                 processed_dfs.append(processed_df)
             else:
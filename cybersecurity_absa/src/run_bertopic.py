@@ -4,11 +4,14 @@
 import warnings
 import os
 import logging
+from _config import CONFIG_PATH, PROJECT_ROOT, load_config, set_default_thread_env
 
 # Set TensorFlow environment variables to minimize logs
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"  # Hide INFO, WARNING, and ERROR logs
 os.environ["TF_DEPRECATION_WARNINGS"] = "0"  # Disable TF deprecation warnings
 
+set_default_thread_env()
+
 # Configure Python warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -23,20 +26,110 @@ logging.getLogger('tf_keras').setLevel(logging.ERROR)
 from bertopic import BERTopic
 from sentence_transformers import SentenceTransformer
 from sklearn.feature_extraction.text import CountVectorizer
-import configparser
+import hashlib
+import numpy as np
 import pandas as pd
-from pathlib import Path
+import torch
+
+# Optional GPU implementations of UMAP/HDBSCAN (RAPIDS cuML); BERTopic's CPU
+# defaults are used when cuML is not installed
+try:
+    from cuml.manifold import UMAP as cuUMAP
+    from cuml.cluster import HDBSCAN as cuHDBSCAN
+except ImportError:
+    cuUMAP = cuHDBSCAN = None
+
+def pick_device():
+    """Return the best available torch device name for the embedding model."""
+    if torch.cuda.is_available():
+        return "cuda"
+    if getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+def encode_texts(embedding_model, texts, batch_size):
+    """
+    Encode texts to L2-normalized float32 numpy embeddings.
+
+    With more than one CUDA device the texts are spread over a pool with one
+    worker process per GPU; otherwise they are encoded in this process.
+    A half-precision model's output is cast up for UMAP/HDBSCAN.
+    """
+    if torch.cuda.device_count() > 1:
+        pool = embedding_model.start_multi_process_pool()
+        try:
+            embeddings = embedding_model.encode_multi_process(
+                texts,
+                pool,
+                batch_size=batch_size,
+                normalize_embeddings=True
+            )
+        finally:
+            embedding_model.stop_multi_process_pool(pool)
+    else:
+        with torch.inference_mode():
+            embeddings = embedding_model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=True,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+    return embeddings.astype(np.float32, copy=False)
+
+def encode_with_cache(embedding_model, model_name, texts, batch_size, cache_path):
+    """
+    Encode texts, reusing embeddings stored in cache_path from earlier runs.
+
+    Entries are keyed by a hash of the model name and the text, so only texts
+    not seen before with this model are sent to the encoder. The cache file
+    is an .npz holding the keys and the stacked embedding matrix; it only
+    keeps the entries of the current run, so it does not grow without bound.
+    """
+    keys = [
+        hashlib.blake2b(f"{model_name}\0{t}".encode('utf-8'), digest_size=16).hexdigest()
+        for t in texts
+    ]
+
+    cache = {}
+    if cache_path.exists():
+        try:
+            with np.load(cache_path) as data:
+                cache = dict(zip(data['keys'].tolist(), data['embeddings']))
+        except Exception as e:
+            print(f"Ignoring unreadable embedding cache {cache_path}: {e}")
+
+    # Encode each unseen text once, even if it appears several times
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cache and key not in missing:
+            missing[key] = text
+    print(f"Embedding cache: {len(texts) - len(missing)} reused, {len(missing)} to encode")
+
+    if missing:
+        new_embeddings = encode_texts(embedding_model, list(missing.values()), batch_size)
+        cache.update(zip(missing.keys(), new_embeddings))
+
+    # Rewrite the cache with only this run's entries when it gained new ones
+    # or holds entries for texts (or models) no longer in use
+    current = dict.fromkeys(keys)
+    if missing or len(cache) != len(current):
+        np.savez(
+            cache_path,
+            keys=np.array(list(current)),
+            embeddings=np.stack([cache[key] for key in current])
+        )
+
+    return np.stack([cache[key] for key in keys])
 
 def run_bertopic_analysis():
     # --- Resolve project root and config ---
-    project_root = Path(__file__).parent.parent
-    config_path = project_root / 'config.ini'
+    project_root = PROJECT_ROOT
     
-    if not config_path.exists():
-        raise FileNotFoundError(f"Config file not found at: {config_path}")
+    if not CONFIG_PATH.exists():
+        raise FileNotFoundError(f"Config file not found at: {CONFIG_PATH}")
     
-    config = configparser.ConfigParser()
-    config.read(config_path)
+    config = load_config()
     
     if 'paths' not in config:
         raise ValueError("Missing '[paths]' section in config.ini")
@@ -82,8 +175,62 @@ def run_bertopic_analysis():
 
     # --- Configure embedding model ---
     embedding_model_name = config['topic_modeling']['embedding_model']
-    print(f"Loading embedding model: {embedding_model_name}")
-    embedding_model = SentenceTransformer(embedding_model_name)
+    device = pick_device()
+    embed_backend = config['topic_modeling'].get('embed_backend', 'torch').strip().lower()
+    if embed_backend not in ('torch', 'onnx'):
+        raise ValueError(f"Invalid 'embed_backend' in config: expected torch or onnx, got '{embed_backend}'")
+    print(f"Loading embedding model: {embedding_model_name} (device={device}, backend={embed_backend})")
+    if embed_backend == 'onnx':
+        # sentence-transformers exports the model to ONNX Runtime on first use
+        # (needs optimum[onnxruntime]); keep the export so reruns skip it
+        onnx_dir = models_dir / "onnx" / embedding_model_name.replace('/', '_')
+        if onnx_dir.exists():
+            embedding_model = SentenceTransformer(str(onnx_dir), device=device, backend='onnx')
+        else:
+            embedding_model = SentenceTransformer(embedding_model_name, device=device, backend='onnx')
+            embedding_model.save_pretrained(str(onnx_dir))
+            print(f"ONNX export saved to: {onnx_dir}")
+    else:
+        embedding_model = SentenceTransformer(embedding_model_name, device=device)
+
+    # fp16 halves the weights on GPU; int8 applies dynamic quantization to the
+    # Linear layers on CPU. Either only nudges the vectors, which does not
+    # matter for the relative distances BERTopic clusters on
+    embed_precision = config['topic_modeling'].get('embed_precision', 'fp32').strip().lower()
+    if embed_precision not in ('fp32', 'fp16', 'int8'):
+        raise ValueError(f"Invalid 'embed_precision' in config: expected fp32, fp16 or int8, got '{embed_precision}'")
+    if embed_precision != 'fp32' and embed_backend == 'onnx':
+        print(f"{embed_precision} applies to the torch backend only; using the fp32 ONNX model")
+        embed_precision = 'fp32'
+    elif embed_precision == 'fp16' and device == 'cpu':
+        print("fp16 embeddings need a GPU; using fp32 on CPU")
+        embed_precision = 'fp32'
+    elif embed_precision == 'int8' and device != 'cpu':
+        print(f"int8 quantization is CPU-only; using fp32 on {device}")
+        embed_precision = 'fp32'
+
+    if embed_precision == 'fp16':
+        embedding_model.half()
+    elif embed_precision == 'int8':
+        embedding_model = torch.quantization.quantize_dynamic(
+            embedding_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    # --- Precompute embeddings ---
+    # Encoding explicitly lets us use large batches on the GPU instead of
+    # BERTopic's default; vectors are L2-normalized, which leaves the cosine
+    # distances used by UMAP unchanged
+    embed_batch_size = int(config['topic_modeling'].get('embed_batch_size', 128))
+    embed_cache_path = models_dir / "embed_cache.npz"
+    print(f"Encoding documents (batch_size={embed_batch_size}, precision={embed_precision}, cache={embed_cache_path})...")
+    # ONNX and reduced-precision vectors are cached separately from the
+    # torch fp32 ones
+    cache_model_id = f"{embedding_model_name}@{embed_backend}"
+    if embed_precision != 'fp32':
+        cache_model_id = f"{cache_model_id}@{embed_precision}"
+    embeddings = encode_with_cache(
+        embedding_model, cache_model_id, texts, embed_batch_size, embed_cache_path
+    )
 
     # --- Parse nr_topics (support 'auto' or integer) ---
     nr_topics = config['topic_modeling']['nr_topics'].strip()
@@ -100,10 +247,32 @@ def run_bertopic_analysis():
 
     print(f"Initializing BERTopic (min_topic_size={min_topic_size}, nr_topics={nr_topics}, verbose={verbose})...")
     
+    # --- Dimensionality reduction / clustering ---
+    # Mirrors BERTopic's default parameters so results stay comparable; the
+    # embeddings are normalized, so euclidean UMAP matches the cosine default
+    umap_model = hdbscan_model = None
+    if cuUMAP is not None and torch.cuda.is_available():
+        print("Using cuML GPU UMAP and HDBSCAN")
+        umap_model = cuUMAP(n_components=5, n_neighbors=15, min_dist=0.0)
+        hdbscan_model = cuHDBSCAN(
+            min_cluster_size=min_topic_size,
+            cluster_selection_method='eom',
+            gen_min_span_tree=True,
+            prediction_data=True
+        )
+
+    # BERTopic fits the vectorizer on one concatenated document per topic, so
+    # min_df counts topics, not input documents. Capping the vocabulary and
+    # using int32 counts keeps the c-TF-IDF matrices small on large corpora.
+    # clean_text is already lowercased by preprocess_data, so it is not redone.
+    topic_section = config['topic_modeling']
     vectorizer_model = CountVectorizer(
         stop_words="english",
-        ngram_range=(1, 3),
-        min_df=2
+        lowercase=False,
+        ngram_range=(1, topic_section.getint('vectorizer_max_ngram', 3)),
+        min_df=topic_section.getint('vectorizer_min_df', 2),
+        max_features=topic_section.getint('vectorizer_max_features', 50000) or None,
+        dtype=np.int32
     )
 
     topic_model = BERTopic(
@@ -111,12 +280,14 @@ def run_bertopic_analysis():
         min_topic_size=min_topic_size,
         nr_topics=nr_topics,
         verbose=verbose,
-        vectorizer_model=vectorizer_model
+        vectorizer_model=vectorizer_model,
+        umap_model=umap_model,
+        hdbscan_model=hdbscan_model
     )
 
     # --- Fit model ---
     print("Fitting BERTopic model... (this may take several minutes)")
-    topics, probs = topic_model.fit_transform(texts)
+    topics, probs = topic_model.fit_transform(texts, embeddings)
 
     # --- Inspect topics ---
     topic_info = topic_model.get_topic_info()
@@ -124,18 +295,12 @@ def run_bertopic_analysis():
     print(topic_info.head(10))
 
     # --- Add topic info to dataframe ---
-    combined_df = combined_df.copy()
     combined_df['bertopic_id'] = topics
     combined_df['bertopic_probability'] = probs
 
-    # --- Save visualizations ---
-    print("Generating visualizations...")
-    
-    # Save topic model
-    model_path = models_dir / "bertopic_model"
-    topic_model.save(str(model_path))
-    print(f"Model saved to: {model_path}")
-    
+    # --- Save outputs ---
+    # The CSVs are written first so a failed model save does not lose the
+    # topic assignments
     # Save topic info
     topic_info_path = models_dir / "bertopic_topic_info.csv"
     topic_info.to_csv(topic_info_path, index=False)
@@ -146,34 +311,50 @@ def run_bertopic_analysis():
     combined_df.to_csv(output_path, index=False)
     print(f"Dataset with topics saved to: {output_path}")
     
-    # Generate visualizations
-    try:
-        # Topic visualization
-        topic_viz = topic_model.visualize_topics()
-        topic_viz_path = visualizations_dir / "bertopic_topics.html"
-        topic_viz.write_html(str(topic_viz_path))
-        print(f"Topics visualization saved to: {topic_viz_path}")
+    # Save topic model as safetensors plus JSON config. Only the embedding
+    # model's name is stored; BERTopic.load(model_path, embedding_model=...)
+    # fetches it again instead of unpickling a full copy. This is a directory,
+    # so it cannot reuse the path of the old pickled bertopic_model file.
+    model_path = models_dir / "bertopic_model_st"
+    topic_model.save(
+        str(model_path),
+        serialization="safetensors",
+        save_ctfidf=True,
+        save_embedding_model=embedding_model_name
+    )
+    print(f"Model saved to: {model_path}")
+    
+    # Generate visualizations (set generate_visualizations = False to skip
+    # them in headless/batch runs)
+    if config['topic_modeling'].getboolean('generate_visualizations', fallback=True):
+        print("Generating visualizations...")
+        try:
+            # Topic visualization
+            topic_viz = topic_model.visualize_topics()
+            topic_viz_path = visualizations_dir / "bertopic_topics.html"
+            topic_viz.write_html(str(topic_viz_path))
+            print(f"Topics visualization saved to: {topic_viz_path}")
         
-        # Topic hierarchy visualization
-        hierarchy_viz = topic_model.visualize_hierarchy()
-        hierarchy_viz_path = visualizations_dir / "bertopic_hierarchy.html"
-        hierarchy_viz.write_html(str(hierarchy_viz_path))
-        print(f"Topic hierarchy visualization saved to: {hierarchy_viz_path}")
+            # Topic hierarchy visualization
+            hierarchy_viz = topic_model.visualize_hierarchy()
+            hierarchy_viz_path = visualizations_dir / "bertopic_hierarchy.html"
+            hierarchy_viz.write_html(str(hierarchy_viz_path))
+            print(f"Topic hierarchy visualization saved to: {hierarchy_viz_path}")
         
-        # Word cloud visualization
-        wordcloud_viz = topic_model.visualize_barchart()
-        wordcloud_viz_path = visualizations_dir / "bertopic_wordcloud.html"
-        wordcloud_viz.write_html(str(wordcloud_viz_path))
-        print(f"Word cloud visualization saved to: {wordcloud_viz_path}")
+            # Word cloud visualization
+            wordcloud_viz = topic_model.visualize_barchart()
+            wordcloud_viz_path = visualizations_dir / "bertopic_wordcloud.html"
+            wordcloud_viz.write_html(str(wordcloud_viz_path))
+            print(f"Word cloud visualization saved to: {wordcloud_viz_path}")
         
-        # Topic similarity heatmap
-        heatmap_viz = topic_model.visualize_heatmap()
-        heatmap_viz_path = visualizations_dir / "bertopic_heatmap.html"
-        heatmap_viz.write_html(str(heatmap_viz_path))
-        print(f"Topic similarity heatmap saved to: {heatmap_viz_path}")
+            # Topic similarity heatmap
+            heatmap_viz = topic_model.visualize_heatmap()
+            heatmap_viz_path = visualizations_dir / "bertopic_heatmap.html"
+            heatmap_viz.write_html(str(heatmap_viz_path))
+            print(f"Topic similarity heatmap saved to: {heatmap_viz_path}")
         
-    except Exception as e:
-        print(f"Error generating visualizations: {e}")
+        except Exception as e:
+            print(f"Error generating visualizations: {e}")
     
     print("\nBERTopic analysis completed successfully!")
     return combined_df, topic_model
@@ -1,64 +1,143 @@
 # src/run_project.py
+import importlib
 import subprocess
 import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 import os
 
+# Each script mapped to the scripts whose outputs it reads. Scripts whose
+# dependencies have all finished run concurrently (the collectors are
+# independent network-bound scrapers).
+PIPELINE = {
+    "collect_eurepoc.py": [],
+    "collect_cisa_trafilatura.py": [],
+    "collect_csis_trafilatura.py": [],
+    "preprocess_data.py": [
+        "collect_eurepoc.py",
+        "collect_cisa_trafilatura.py",
+        "collect_csis_trafilatura.py"
+    ],
+    "run_bertopic.py": ["preprocess_data.py"],
+    "run_pyabsa_baseline.py": ["run_bertopic.py"],
+    "phase1_report.py": ["run_bertopic.py", "run_pyabsa_baseline.py"]
+}
+
+# Function each script runs under __main__, used when stages run in-process
+ENTRY_POINTS = {
+    "run_bertopic.py": "run_bertopic_analysis"
+}
+
 def run_script(script_name):
     """Run a Python script and return success status"""
     try:
-        # Change to the project root directory (cybersecurity_absa)
+        # Run from the project root directory (cybersecurity_absa). Passed as
+        # cwd rather than os.chdir so concurrent scripts do not race on it.
         project_root = Path(__file__).parent.parent
-        os.chdir(project_root)
         
         script_path = Path("src") / script_name
         
-        result = subprocess.run([sys.executable, str(script_path)], 
-                              capture_output=True, text=True)
+        # Output is streamed straight to the console instead of being buffered
+        result = subprocess.run([sys.executable, str(script_path)], cwd=project_root)
         
         if result.returncode == 0:
             print(f"{script_name} completed successfully")
             return True
         else:
-            print(f"{script_name} failed with error:")
-            print(result.stderr)
+            print(f"{script_name} failed with exit code {result.returncode}")
             return False
     except Exception as e:
         print(f"Error running {script_name}: {e}")
         return False
 
+def run_stage(script_name):
+    """
+    Run a script's entry point inside this process and return success status.
+
+    Stages share one interpreter, so torch, transformers and friends are
+    imported once for the whole pipeline instead of once per script.
+    """
+    try:
+        module = importlib.import_module(Path(script_name).stem)
+        getattr(module, ENTRY_POINTS.get(script_name, "main"))()
+        print(f"{script_name} completed successfully")
+        return True
+    except SystemExit as e:
+        # A stage calling sys.exit must not end the whole pipeline process
+        if e.code in (None, 0):
+            print(f"{script_name} completed successfully")
+            return True
+        print(f"{script_name} failed with exit code {e.code}")
+        return False
+    except Exception as e:
+        print(f"{script_name} failed with error: {e}")
+        traceback.print_exc()
+        return False
+
+def run_pipeline(pipeline, runner=run_script):
+    """
+    Run the scripts of a {script: [dependencies]} mapping, starting each one
+    as soon as its dependencies have succeeded.
+
+    After a failure no new scripts are started; scripts already running are
+    allowed to finish. runner runs one script and returns its success status.
+    Returns True if every script succeeded.
+    """
+    pending = dict(pipeline)
+    running = {}
+    succeeded = set()
+    failed = None
+    
+    with ThreadPoolExecutor(max_workers=len(pipeline)) as executor:
+        while True:
+            if failed is None:
+                for script, deps in list(pending.items()):
+                    if all(dep in succeeded for dep in deps):
+                        print(f"\nRunning {script}...")
+                        running[executor.submit(runner, script)] = script
+                        del pending[script]
+            
+            if not running:
+                break
+            
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                script = running.pop(future)
+                if future.result():
+                    succeeded.add(script)
+                elif failed is None:
+                    failed = script
+    
+    if failed is not None:
+        print(f"Stopping execution due to failure in {failed}")
+    elif pending:
+        print(f"Not run due to unmet dependencies: {', '.join(pending)}")
+    return failed is None and not pending
+
 def main():
-    scripts = [
-        "collect_eurepoc.py",
-        "collect_cisa_trafilatura.py", 
-        "collect_csis_trafilatura.py",
-        "preprocess_data.py",
-        "run_bertopic.py",
-        "run_pyabsa_baseline.py",
-        "phase1_report.py"
-    ]
+    # Stages run in this process by default; --isolate runs each script in its
+    # own interpreter so a crash (e.g. a native library fault) stays contained
+    isolate = "--isolate" in sys.argv[1:]
     
     print("Starting Cybersecurity ABSA Project Execution...")
     print("=" * 50)
     
-    # Change to project root at the start
+    # In-process stages resolve some relative paths against the working
+    # directory, so run from the project root as the scripts expect
     project_root = Path(__file__).parent.parent
     original_cwd = os.getcwd()
     os.chdir(project_root)
     print(f"Working directory: {os.getcwd()}")
+    print(f"Mode: {'one process per script' if isolate else 'in-process'}")
     
-    for script in scripts:
-        print(f"\nRunning {script}...")
-        success = run_script(script)
-        if not success:
-            print(f"Stopping execution due to failure in {script}")
-            break
-    
-    # Change back to original directory
-    os.chdir(original_cwd)
+    try:
+        run_pipeline(PIPELINE, run_script if isolate else run_stage)
+    finally:
+        os.chdir(original_cwd)
     
     print("\n" + "=" * 50)
     print("Project execution completed!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,16 +1,33 @@
+# === Thread settings (before torch/transformers are imported) ===
+import os
+from _config import CONFIG_PATH, PROJECT_ROOT, load_config, set_default_thread_env
+
+set_default_thread_env()
+
 # === PATCH DebertaV2TokenizerFast to avoid bos_token/eos_token error ===
 from transformers import DebertaV2TokenizerFast
 
-_original_getattribute = DebertaV2TokenizerFast.__getattribute__
+def _token_with_default(name, default):
+    """
+    Property returning the stored special token, or default when it is unset.
+
+    Only this attribute is overridden, so other attribute lookups on the
+    tokenizer (including those in the tokenization loop) are untouched.
+    """
+    inherited = getattr(DebertaV2TokenizerFast, name, None)
+    if isinstance(inherited, property) and inherited.fset is not None:
+        setter = inherited.fset
+    else:
+        def setter(self, value):
+            self.__dict__['_' + name] = value
+
+    def getter(self):
+        return getattr(self, '_' + name, None) or default
 
-def _safe_getattribute(self, name):
-    if name == 'bos_token':
-        return getattr(self, '_bos_token', None) or '[CLS]'
-    if name == 'eos_token':
-        return getattr(self, '_eos_token', None) or '[SEP]'
-    return _original_getattribute(self, name)
+    return property(getter, setter)
 
-DebertaV2TokenizerFast.__getattribute__ = _safe_getattribute
+DebertaV2TokenizerFast.bos_token = _token_with_default('bos_token', '[CLS]')
+DebertaV2TokenizerFast.eos_token = _token_with_default('eos_token', '[SEP]')
 
 # === Imports ===
 import warnings
@@ -18,10 +35,8 @@ import os
 import logging
 from pyabsa import AspectTermExtraction as ATEPC
 from pyabsa import available_checkpoints
-import configparser
 import pandas as pd
-from tqdm import tqdm
-from pathlib import Path
+from _results import ResultColumns, count_mismatch
 
 # === Suppress warnings early ===
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
@@ -33,36 +48,47 @@ logging.getLogger('tensorflow').setLevel(logging.ERROR)
 logging.getLogger('pyabsa').setLevel(logging.ERROR)
 logging.getLogger('spacy').setLevel(logging.ERROR)
 
-# === Load a working checkpoint ONCE ===
-atepc_ckpts = available_checkpoints().get("ATEPC", [])
-print("Available ATEPC checkpoints:", atepc_ckpts)
-
-# These don't exist for ATEPC
-safe_candidates = ['bert_base', 'lcf_bert', 'fast_lcf_bert', 'roberta_base']
-candidates = [c for c in safe_candidates if c in atepc_ckpts] + ['english', 'multilingual']
-
-aspect_extractor = None
-for ckpt in candidates:
+def _load_checkpoint(ckpt):
+    print(f"Loading checkpoint: {ckpt}")
+    # auto_device places the model on the GPU when one is available
+    aspect_extractor = ATEPC.AspectExtractor(ckpt, auto_device=True)
+    print(f"Success with {ckpt}")
+    return aspect_extractor
+
+def load_aspect_extractor(checkpoint='english'):
+    """
+    Load the configured ATEPC checkpoint. Only if that fails are the
+    available checkpoints listed (a hub query) to find a working fallback.
+    """
     try:
-        print(f"Loading checkpoint: {ckpt}")
-        aspect_extractor = ATEPC.AspectExtractor(ckpt)
-        print(f"Success with {ckpt}")
-        break
+        return _load_checkpoint(checkpoint)
     except Exception as e:
-        print(f"Failed to load checkpoint '{ckpt}': {e}")
+        print(f"Failed to load checkpoint '{checkpoint}': {e}")
+
+    atepc_ckpts = available_checkpoints().get("ATEPC", [])
+    print("Available ATEPC checkpoints:", atepc_ckpts)
+
+    # These don't exist for ATEPC
+    safe_candidates = ['bert_base', 'lcf_bert', 'fast_lcf_bert', 'roberta_base']
+    candidates = [c for c in safe_candidates if c in atepc_ckpts] + ['english', 'multilingual']
+
+    for ckpt in candidates:
+        if ckpt == checkpoint:
+            continue
+        try:
+            return _load_checkpoint(ckpt)
+        except Exception as e:
+            print(f"Failed to load checkpoint '{ckpt}': {e}")
 
-if aspect_extractor is None:
     raise RuntimeError("No working ATEPC checkpoint found. Please check available_checkpoints().")
 
 def run_pyabsa_baseline(aspect_extractor):
-    project_root = Path(__file__).parent.parent
-    config_path = project_root / 'config.ini'
+    project_root = PROJECT_ROOT
     
-    if not config_path.exists():
-        raise FileNotFoundError(f"Config file not found at: {config_path}")
+    if not CONFIG_PATH.exists():
+        raise FileNotFoundError(f"Config file not found at: {CONFIG_PATH}")
     
-    config = configparser.ConfigParser()
-    config.read(config_path)
+    config = load_config()
     
     if 'paths' not in config:
         raise ValueError("Missing '[paths]' section in config.ini")
@@ -87,45 +113,58 @@ def run_pyabsa_baseline(aspect_extractor):
             "Please run the BERTopic analysis script first."
         )
     
-    df_with_topics = pd.read_csv(input_file)
+    # Only the text column is used here; skip converting the topic columns
+    df_with_topics = pd.read_csv(input_file, usecols=['clean_text'])
     print(f"Successfully loaded data with {len(df_with_topics)} records")
 
     sample_texts = df_with_topics['clean_text'].head(20).tolist()
 
-    results = []
-    print("Extracting aspects using PyABSA baseline...")
-    for i, text in enumerate(tqdm(sample_texts, desc="Extracting aspects")):
+    # One predict call for the whole list lets PyABSA batch the forward passes
+    batch_size = config.getint('models', 'batch_size', fallback=32)
+    print(f"Extracting aspects using PyABSA baseline (batch_size={batch_size})...")
+    try:
+        predictions = aspect_extractor.predict(
+            sample_texts,
+            save_result=False,
+            print_result=False,
+            ignore_error=True,
+            eval_batch_size=batch_size
+        )
+    except Exception as e:
+        print(f"Error extracting aspects: {e}")
+        # Record the failure against every text in the batch
+        predictions = [{'error': str(e)}] * len(sample_texts)
+    else:
+        error = count_mismatch(predictions, sample_texts)
+        if error:
+            print(f"Error extracting aspects: {error}")
+            predictions = [{'error': error}] * len(sample_texts)
+
+    results = ResultColumns(('text_id', 'original_text', 'aspects', 'sentiments', 'confidences', 'success', 'error'))
+    for text_id, (text, prediction) in enumerate(zip(sample_texts, predictions)):
         try:
-            prediction = aspect_extractor.predict(
-                text,
-                save_result=False,
-                ignore_error=True
-            )
-            
-            aspects = getattr(prediction, 'aspect', [])
-            sentiments = getattr(prediction, 'sentiment', [])
-            confidences = getattr(prediction, 'confidence', [])
-            
-            results.append({
-                'text_id': i,
-                'original_text': text,
-                'aspects': aspects,
-                'sentiments': sentiments,
-                'confidences': confidences,
-                'success': True
-            })
+            if 'error' in prediction:
+                raise RuntimeError(prediction['error'])
+
+            aspects = prediction.get('aspect', [])
+            sentiments = prediction.get('sentiment', [])
+            confidences = prediction.get('confidence', [])
+            error = None
         except Exception as e:
-            results.append({
-                'text_id': i,
-                'original_text': text,
-                'aspects': [],
-                'sentiments': [],
-                'confidences': [],
-                'success': False,
-                'error': str(e)
-            })
-
-    baseline_results_df = pd.DataFrame(results)
+            aspects, sentiments, confidences = [], [], []
+            error = str(e)
+        
+        results.append({
+            'text_id': text_id,
+            'original_text': text,
+            'aspects': aspects,
+            'sentiments': sentiments,
+            'confidences': confidences,
+            'success': error is None,
+            'error': error
+        })
+
+    baseline_results_df = results.to_frame()
     print(f"Baseline PyABSA extraction completed for {len(baseline_results_df)} samples.")
 
     output_file = processed_data_dir / 'baseline_aspect_extraction.csv'
@@ -137,14 +176,14 @@ def run_pyabsa_baseline(aspect_extractor):
     
     successful_df = baseline_results_df[baseline_results_df['success']]
     if len(successful_df) > 0:
-        all_aspects = [a for sublist in successful_df['aspects'] for a in sublist]
-        if all_aspects:
-            top_aspects = pd.Series(all_aspects).value_counts().head(5).to_dict()
+        aspect_counts = successful_df['aspects'].explode().dropna().value_counts()
+        if not aspect_counts.empty:
+            top_aspects = aspect_counts.head(5).to_dict()
             print(f"Top 5 extracted aspects: {top_aspects}")
         
-        all_sentiments = [s for sublist in successful_df['sentiments'] for s in sublist]
-        if all_sentiments:
-            sentiment_dist = pd.Series(all_sentiments).value_counts().to_dict()
+        sentiment_counts = successful_df['sentiments'].explode().dropna().value_counts()
+        if not sentiment_counts.empty:
+            sentiment_dist = sentiment_counts.to_dict()
             print(f"Sentiment distribution: {sentiment_dist}")
 
     return baseline_results_df
@@ -152,6 +191,9 @@ def run_pyabsa_baseline(aspect_extractor):
 
 def main():
     try:
+        checkpoint = load_config().get('models', 'baseline_checkpoint', fallback='english')
+        aspect_extractor = load_aspect_extractor(checkpoint)
+        
         baseline_results_df = run_pyabsa_baseline(aspect_extractor)
         print("\nPyABSA baseline analysis completed successfully.")
     except Exception as e:
@@ -2,13 +2,18 @@
 import warnings
 import os
 import logging
+from _config import PROJECT_ROOT, load_config, set_default_thread_env
+
+set_default_thread_env()
+
 from pyabsa import AspectTermExtraction as ATEPC
-import configparser
+from cybersecurity_atepc_inference import AUTOCAST_DTYPES, inference_context, quantize_dynamic_int8
 import pandas as pd
+from _results import ResultColumns, count_mismatch
 from tqdm import tqdm
 from pathlib import Path
 import re
-import ast
+import json
 
 # === Suppress warnings and logs ===
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
@@ -26,10 +31,34 @@ logging.getLogger('pyabsa').setLevel(logging.ERROR)
 logging.getLogger('spacy').setLevel(logging.ERROR)
 logging.getLogger('weasel').setLevel(logging.ERROR)
 
+# Number of texts taken from the topic dataset for extraction
+SAMPLE_SIZE = 20
+
+# Files every usable FAST-LCF-ATEPC checkpoint directory contains
+_REQUIRED_CHECKPOINT_FILES = (
+    "fast_lcf_atepc.config",
+    "fast_lcf_atepc.state_dict",
+    "fast_lcf_atepc.tokenizer"
+)
+
+_APC_ACC_RE = re.compile(r'apcacc_(\d+\.\d+)')
+
+_PREDICTION_FIELDS = ('aspect', 'sentiment', 'confidence', 'position')
+
+# "aspect:polarity Confidence:score" entries in a printed prediction
+_ASPECT_RESULT_RE = re.compile(r'([^:<\s]+):(-?\d+)\s+Confidence:(\d+\.\d+)')
+
+# Result columns holding one list per text
+_LIST_COLUMNS = ('aspects', 'sentiments', 'confidences', 'positions')
+
+def _to_json(value):
+    # NumPy scalars in PyABSA outputs are written as plain numbers
+    return json.dumps(value, default=lambda o: o.item() if hasattr(o, 'item') else str(o))
+
 def find_custom_model():
     """Find the custom-trained model checkpoint in the project root"""
     # The checkpoints are saved in the project root, not in the models directory
-    project_root = Path(__file__).parent.parent
+    project_root = PROJECT_ROOT
     checkpoints_dir = project_root.parent / "checkpoints"  # Go up one more level
     
     print(f"Searching for models in: {checkpoints_dir.absolute()}")
@@ -40,86 +69,60 @@ def find_custom_model():
     
     print(f" Found checkpoints directory: {checkpoints_dir}")
     
-    # Find all checkpoint directories that match our custom model pattern
+    # Find all checkpoint directories that match our custom model pattern.
+    # scandir yields the entry types without extra stat calls, and listing a
+    # candidate once replaces one exists() call per required file.
     custom_checkpoints = []
-    for checkpoint_dir in checkpoints_dir.iterdir():
-        if checkpoint_dir.is_dir():
-            dir_name_lower = checkpoint_dir.name.lower()
+    with os.scandir(checkpoints_dir) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            dir_name_lower = entry.name.lower()
             is_fast_lcf = "fast_lcf_atepc" in dir_name_lower
             is_custom = "custom" in dir_name_lower or "cybersecurity" in dir_name_lower or "dataset" in dir_name_lower
             
             if is_fast_lcf and is_custom:
                 # Check if it contains the necessary files for ATEPC
-                required_files = [
-                    checkpoint_dir / "fast_lcf_atepc.config",
-                    checkpoint_dir / "fast_lcf_atepc.state_dict", 
-                    checkpoint_dir / "fast_lcf_atepc.tokenizer"
-                ]
-                
-                # Check each required file
-                missing_files = [req_file for req_file in required_files if not req_file.exists()]
-                
-                if not missing_files:
-                    custom_checkpoints.append(checkpoint_dir)
+                with os.scandir(entry.path) as files:
+                    file_names = {f.name for f in files}
+                if all(name in file_names for name in _REQUIRED_CHECKPOINT_FILES):
+                    custom_checkpoints.append(Path(entry.path))
     
     if not custom_checkpoints:
         print(" No valid custom model checkpoints found")
         return None
     
-    # Sort by APC accuracy (extracted from directory name) to get the best model
+    # Pick the best model by APC accuracy (extracted from directory name)
     def extract_acc_from_name(dirname):
-        match = re.search(r'apcacc_(\d+\.\d+)', str(dirname))
+        match = _APC_ACC_RE.search(dirname)
         if match:
             return float(match.group(1))
         return 0.0
     
-    custom_checkpoints.sort(key=lambda x: extract_acc_from_name(x.name), reverse=True)
-    
-    # Return the best model
-    best_model = custom_checkpoints[0]
+    best_model = max(custom_checkpoints, key=lambda x: extract_acc_from_name(x.name))
     best_acc = extract_acc_from_name(best_model.name)
     print(f" Selected best model: {best_model.name} (APC Accuracy: {best_acc})")
     return best_model
 
 def parse_pyabsa_result(prediction):
     """Parse PyABSA prediction result and extract aspects, sentiments, confidences, and positions"""
-    # Initialize default values
-    aspects = []
-    sentiments = []
-    confidences = []
-    positions = []
-    
     try:
-        # PyABSA can return results in different formats
-        # Try to get aspects
-        if hasattr(prediction, 'aspect'):
-            aspects = prediction.aspect
-        elif isinstance(prediction, dict) and 'aspect' in prediction:
-            aspects = prediction['aspect']
-        
-        # Try to get sentiments
-        if hasattr(prediction, 'sentiment'):
-            sentiments = prediction.sentiment
-        elif isinstance(prediction, dict) and 'sentiment' in prediction:
-            sentiments = prediction['sentiment']
-        
-        # Try to get confidences
-        if hasattr(prediction, 'confidence'):
-            confidences = prediction.confidence
-        elif isinstance(prediction, dict) and 'confidence' in prediction:
-            confidences = prediction['confidence']
+        # PyABSA can return results in different formats: a dict or an
+        # object exposing the fields as attributes
+        if isinstance(prediction, dict):
+            fields = prediction
+        else:
+            fields = {name: getattr(prediction, name, None) for name in _PREDICTION_FIELDS}
         
-        # Try to get positions
-        if hasattr(prediction, 'position'):
-            positions = prediction.position
-        elif isinstance(prediction, dict) and 'position' in prediction:
-            positions = prediction['position']
+        aspects = fields.get('aspect') or []
+        sentiments = fields.get('sentiment') or []
+        confidences = fields.get('confidence') or []
+        positions = fields.get('position') or []
         
         # If we still don't have aspects, try to parse from the string representation
-        if not aspects and hasattr(prediction, '__str__'):
-            pred_str = str(prediction)
+        if not aspects:
             # Look for patterns like "aspect:-1 Confidence:0.964"
-            aspect_matches = re.findall(r'([^:<\s]+):(-?\d+)\s+Confidence:(\d+\.\d+)', pred_str)
+            aspect_matches = _ASPECT_RESULT_RE.findall(str(prediction))
             if aspect_matches:
                 aspects = [match[0] for match in aspect_matches]
                 sentiments = [match[1] for match in aspect_matches]
@@ -143,12 +146,10 @@ def parse_pyabsa_result(prediction):
 
 def run_custom_pyabsa():
     # Load configuration
-    config = configparser.ConfigParser()
-    config_path = Path(__file__).parent.parent / 'config.ini'
-    config.read(config_path)
+    config = load_config()
     
     # Get paths
-    project_root = Path(__file__).parent.parent
+    project_root = PROJECT_ROOT
     processed_data_dir = project_root / config['paths']['processed_data_dir']
     
     print(f" Project root: {project_root}")
@@ -168,8 +169,9 @@ def run_custom_pyabsa():
             "Please run the BERTopic analysis script first."
         )
     
-    df_with_topics = pd.read_csv(input_file)
-    print(f" Successfully loaded data with {len(df_with_topics)} records")
+    # Only the text of the first SAMPLE_SIZE rows is used, so stop parsing there
+    df_with_topics = pd.read_csv(input_file, usecols=['clean_text'], nrows=SAMPLE_SIZE)
+    print(f" Successfully loaded the first {len(df_with_topics)} records")
 
     # Find the custom model checkpoint
     print("\n" + "="*60)
@@ -188,14 +190,14 @@ def run_custom_pyabsa():
             model_path_str = str(custom_model_path)
             print(f" Attempting to load model from: {model_path_str}")
             
-            aspect_extractor = ATEPC.AspectExtractor(checkpoint=model_path_str)
+            aspect_extractor = ATEPC.AspectExtractor(checkpoint=model_path_str, auto_device=True)
             print(" Successfully loaded custom cybersecurity model")
         except Exception as e:
             print(f" Error loading custom model: {e}")
             print(" Falling back to pretrained model...")
             try:
                 # Use the pretrained English model
-                aspect_extractor = ATEPC.AspectExtractor('english')
+                aspect_extractor = ATEPC.AspectExtractor('english', auto_device=True)
                 print(" Successfully loaded pretrained English model")
             except Exception as e2:
                 print(f" Error loading pretrained model: {e2}")
@@ -203,32 +205,71 @@ def run_custom_pyabsa():
     else:
         print(" No custom model found, using pretrained model...")
         try:
-            aspect_extractor = ATEPC.AspectExtractor('english')
+            aspect_extractor = ATEPC.AspectExtractor('english', auto_device=True)
             print(" Successfully loaded pretrained English model")
         except Exception as e:
             print(f" Error loading pretrained model: {e}")
             raise
 
+    # Models are placed on the GPU when one is available (auto_device); an
+    # optional bf16/fp16 autocast halves the matmul width there
+    precision = config.get('models', 'inference_precision', fallback='none').strip().lower()
+    if precision == 'none':
+        precision = None
+    elif precision not in AUTOCAST_DTYPES:
+        raise ValueError(f"Invalid 'inference_precision' in config: expected none, {' or '.join(AUTOCAST_DTYPES)}, got '{precision}'")
+
+    # Optional int8 dynamic quantization of the Linear layers (CPU only)
+    quantize = config.get('models', 'quantize', fallback='none').strip().lower()
+    if quantize not in ('none', 'int8'):
+        raise ValueError(f"Invalid 'quantize' in config: expected none or int8, got '{quantize}'")
+    if quantize == 'int8' and quantize_dynamic_int8(aspect_extractor):
+        print(" Quantized model Linear layers to int8")
+
     # Sample texts for extraction
-    sample_texts = df_with_topics['clean_text'].head(20).tolist()
+    sample_texts = df_with_topics['clean_text'].tolist()
 
-    results = []
+    results = ResultColumns(('text_id', 'original_text') + _LIST_COLUMNS + ('success', 'error'))
     print("\n" + "="*60)
     print(" EXTRACTING ASPECTS")
     print("="*60)
     print(f"Extracting aspects from {len(sample_texts)} sample texts...")
     
-    for i, text in enumerate(tqdm(sample_texts, desc="Extracting aspects")):
+    # Texts are sent to PyABSA a batch at a time so tokenization and the
+    # forward pass are amortized over the batch instead of paid per text.
+    # Repeated texts (boilerplate in scraped reports) are predicted once.
+    unique_texts = list(dict.fromkeys(sample_texts))
+    predictions_by_text = {}
+    batch_size = config.getint('models', 'batch_size', fallback=32)
+    for start in tqdm(range(0, len(unique_texts), batch_size), desc="Extracting aspects"):
+        batch = unique_texts[start:start + batch_size]
         try:
-            # Extract aspects
-            prediction = aspect_extractor.predict(
-                text,
-                save_result=False,
-                ignore_error=True
-            )
-            
+            with inference_context(aspect_extractor, precision):
+                predictions = aspect_extractor.predict(
+                    batch,
+                    save_result=False,
+                    print_result=False,
+                    ignore_error=True,
+                    eval_batch_size=batch_size
+                )
+        except Exception as e:
+            print(f"Error processing a batch of {len(batch)} texts: {e}")
+            predictions = [e] * len(batch)
+        error = count_mismatch(predictions, batch)
+        if error:
+            print(f"Error processing a batch of {len(batch)} texts: {error}")
+            predictions = [RuntimeError(error)] * len(batch)
+        predictions_by_text.update(zip(batch, predictions))
+    
+    for i, text in enumerate(sample_texts):
+        prediction = predictions_by_text.get(text, RuntimeError('no prediction returned'))
+        if isinstance(prediction, Exception):
+            aspects, sentiments, confidences, positions = [], [], [], []
+            error = str(prediction)
+        else:
             # Parse the prediction result
             aspects, sentiments, confidences, positions = parse_pyabsa_result(prediction)
+            error = None
             
             # Debug: Print the prediction object for the first few examples
             if i < 3:
@@ -239,35 +280,28 @@ def run_custom_pyabsa():
                 print(f"Parsed aspects: {aspects}")
                 print(f"Parsed sentiments: {sentiments}")
                 print(f"Parsed confidences: {confidences}")
-            
-            results.append({
-                'text_id': i,
-                'original_text': text,
-                'aspects': aspects,
-                'sentiments': sentiments,
-                'confidences': confidences,
-                'positions': positions,
-                'success': True
-            })
-        except Exception as e:
-            print(f"Error processing text {i}: {e}")
-            results.append({
-                'text_id': i,
-                'original_text': text,
-                'aspects': [],
-                'sentiments': [],
-                'confidences': [],
-                'positions': [],
-                'success': False,
-                'error': str(e)
-            })
+        
+        results.append({
+            'text_id': i,
+            'original_text': text,
+            'aspects': aspects,
+            'sentiments': sentiments,
+            'confidences': confidences,
+            'positions': positions,
+            'success': error is None,
+            'error': error
+        })
 
-    results_df = pd.DataFrame(results)
+    results_df = results.to_frame()
     print(f" Custom PyABSA extraction completed for {len(results_df)} samples.")
 
     # Save results
+    # List columns are stored as JSON so readers can parse them with
+    # json.loads instead of ast.literal_eval on Python reprs
     output_file = processed_data_dir / 'custom_aspect_extraction.csv'
-    results_df.to_csv(output_file, index=False)
+    results_df.assign(**{
+        column: results_df[column].map(_to_json) for column in _LIST_COLUMNS
+    }).to_csv(output_file, index=False)
     print(f" Results saved to: {output_file}")
 
     # Analyze results
@@ -276,35 +310,36 @@ def run_custom_pyabsa():
     
     successful_df = results_df[results_df['success']]
     if len(successful_df) > 0:
+        # One aspect per row; parse_pyabsa_result keeps the aspect and
+        # sentiment lists the same length, so they explode together
+        long_df = successful_df[['aspects', 'sentiments']].explode(['aspects', 'sentiments']).dropna()
+        
         # Count total aspects extracted
-        total_aspects = sum(len(aspects) for aspects in successful_df['aspects'])
+        total_aspects = len(long_df)
         print(f"Total aspects extracted: {total_aspects}")
         
-        # Get top aspects
-        all_aspects = [a for sublist in successful_df['aspects'] for a in sublist]
-        if all_aspects:
-            top_aspects = pd.Series(all_aspects).value_counts().head(5).to_dict()
+        if total_aspects:
+            # Get top aspects
+            top_aspects = long_df['aspects'].value_counts().head(5).to_dict()
             print(f"Top 5 extracted aspects: {top_aspects}")
-        
-        # Get sentiment distribution
-        all_sentiments = [s for sublist in successful_df['sentiments'] for s in sublist]
-        if all_sentiments:
-            sentiment_dist = pd.Series(all_sentiments).value_counts().to_dict()
+            
+            # Get sentiment distribution
+            sentiment_dist = long_df['sentiments'].value_counts().to_dict()
             print(f"Sentiment distribution: {sentiment_dist}")
     
     # Show failed extractions
     failed_df = results_df[~results_df['success']]
     if len(failed_df) > 0:
         print(f"\n Failed extractions: {len(failed_df)}")
-        for _, row in failed_df.head(2).iterrows():
-            print(f"  - Error: {row['error'][:100]}...")
+        for error in failed_df['error'].head(2):
+            print(f"  - Error: {error[:100]}...")
 
     # Show some example extractions
     print("\n Example Extractions:")
-    for i, row in successful_df.head(3).iterrows():
-        print(f"\nText: {row['original_text'][:100]}...")
-        if row['aspects']:
-            for j, (aspect, sentiment, confidence) in enumerate(zip(row['aspects'], row['sentiments'], row['confidences'])):
+    for row in successful_df.head(3).itertuples(index=False):
+        print(f"\nText: {row.original_text[:100]}...")
+        if row.aspects:
+            for j, (aspect, sentiment, confidence) in enumerate(zip(row.aspects, row.sentiments, row.confidences)):
                 print(f"  Aspect {j+1}: '{aspect}' - Sentiment: {sentiment} (Confidence: {confidence:.2f})")
         else:
             print("  No aspects extracted")
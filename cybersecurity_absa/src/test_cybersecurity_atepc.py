@@ -33,6 +33,9 @@ def test_model():
         "Firewall vulnerabilities allowed unauthorized access to the network."
     ]
     
+    # Map sentiment values to human-readable labels
+    sentiment_map = {'-1': 'Negative', '0': 'Neutral', '1': 'Positive'}
+    
     for text in test_texts:
         try:
             result = aspect_extractor.predict(
@@ -51,9 +54,6 @@ def test_model():
             print(f"Sentiments: {sentiments}")
             print(f"Confidences: {confidences}")
             
-            # Map sentiment values to human-readable labels
-            sentiment_map = {'-1': 'Negative', '0': 'Neutral', '1': 'Positive'}
-            
             # Print each aspect with its sentiment and confidence
             for i, aspect in enumerate(aspects):
                 sentiment_label = sentiment_map.get(sentiments[i], sentiments[i])
@@ -4,8 +4,8 @@ import os
 import logging
 from pyabsa import AspectTermExtraction as ATEPC
 from pyabsa import ModelSaveOption, DeviceTypeOption
-import configparser
 from pathlib import Path
+from _config import PROJECT_ROOT, load_config
 
 # === Suppress warnings and logs ===
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
@@ -53,12 +53,10 @@ def check_dataset_files(dataset_dir):
 
 def train_custom_atepc_model():
     # Load configuration
-    config = configparser.ConfigParser()
-    config_path = Path(__file__).parent.parent / 'config.ini'
-    config.read(config_path)
+    config = load_config()
     
     # Get paths
-    project_root = Path(__file__).parent.parent
+    project_root = PROJECT_ROOT
     custom_dataset_dir = project_root / 'data' / 'custom_cybersecurity_atepc'
     models_dir = project_root / config['paths']['models_dir']
     
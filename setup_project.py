@@ -5,7 +5,8 @@ root_dir = Path.cwd()
 
 # Main project directory to create folders inside (cybersecurity_absa folder)
 project_dir = root_dir / "cybersecurity_absa"
-project_dir.mkdir(exist_ok=True)
+if not project_dir.is_dir():
+    project_dir.mkdir()
 
 # Subdirectories to create under cybersecurity_absa/
 subdirs = [
@@ -18,10 +19,11 @@ subdirs = [
     # 'src' is intentionally excluded
 ]
 
-# Create subdirectories if they don’t already exist
+# Create subdirectories if they don’t already exist (parents=True also
+# creates intermediate directories such as data/ and models/ on the way)
 for subdir in subdirs:
     subdir_path = project_dir / subdir
-    if not subdir_path.exists():
+    if not subdir_path.is_dir():
         subdir_path.mkdir(parents=True, exist_ok=True)
         print(f"Created: {subdir_path}")
     else:
@@ -45,12 +47,22 @@ pretrained_bert = microsoft/deberta-v3-base
 max_seq_len = 128
 dropout = 0.1
 batch_size = 16
+baseline_checkpoint = english
+quantize = none
+inference_precision = none
 
 [topic_modeling]
 embedding_model = all-mpnet-base-v2
 min_topic_size = 10
 nr_topics = 5
 verbose = True
+embed_batch_size = 128
+embed_precision = fp32
+embed_backend = torch
+vectorizer_max_ngram = 3
+vectorizer_min_df = 2
+vectorizer_max_features = 50000
+generate_visualizations = True
 
 [web_scraping]
 target_language = en